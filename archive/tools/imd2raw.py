@@ -4,10 +4,16 @@
 import sys
 import struct
 
+# Track header: mode, cylinder, head (plus map flags), sector count, size code
+TRACK_HEADER = struct.Struct('<5B')
+
 def parse_imd(filename):
     """Parse IMD file and return track data."""
     with open(filename, 'rb') as f:
         data = f.read()
+    # Sector contents are views into the file data, copied only once, into
+    # the raw image
+    view = memoryview(data)
 
     # Find end of header (0x1A)
     header_end = data.find(b'\x1a')
@@ -23,15 +29,11 @@ def parse_imd(filename):
     sector_sizes = [128, 256, 512, 1024, 2048, 4096, 8192]
 
     while pos < len(data):
-        if pos + 5 > len(data):
+        if pos + TRACK_HEADER.size > len(data):
             break
 
-        mode = data[pos]
-        cyl = data[pos + 1]
-        head = data[pos + 2]
-        num_sectors = data[pos + 3]
-        size_code = data[pos + 4]
-        pos += 5
+        mode, cyl, head, num_sectors, size_code = TRACK_HEADER.unpack_from(data, pos)
+        pos += TRACK_HEADER.size
 
         has_cyl_map = (head & 0x80) != 0
         has_head_map = (head & 0x40) != 0
@@ -42,27 +44,35 @@ def parse_imd(filename):
             break
 
         sector_size = sector_sizes[size_code]
+        # Fill sectors repeat the same few bytes: build each once per track
+        unavailable = b'\xe5' * sector_size
+        fill_cache = {}
 
         # Read sector number map
         if pos + num_sectors > len(data):
             break
-        sector_map = list(data[pos:pos + num_sectors])
+        sector_map = list(view[pos:pos + num_sectors])
         pos += num_sectors
 
         # Optional cylinder map
         cyl_map = None
         if has_cyl_map:
-            cyl_map = list(data[pos:pos + num_sectors])
+            cyl_map = list(view[pos:pos + num_sectors])
             pos += num_sectors
 
         # Optional head map
         head_map = None
         if has_head_map:
-            head_map = list(data[pos:pos + num_sectors])
+            head_map = list(view[pos:pos + num_sectors])
             pos += num_sectors
 
-        # Read sector data
-        sectors = {}
+        # Read sector data into a list indexed by sector number (None where
+        # the track has no such sector), and note the order in which sector
+        # numbers first appear. A repeated sector number keeps the data of
+        # its last copy but the place of its first in that order, which is
+        # the order the sectors are written to the image in.
+        sectors = [None] * (max(sector_map, default=0) + 1)
+        order = []
         for i in range(num_sectors):
             if pos >= len(data):
                 break
@@ -72,35 +82,39 @@ def parse_imd(filename):
 
             if stype == 0:
                 # Unavailable
-                sector_data = b'\xe5' * sector_size
+                sector_data = unavailable
             elif stype == 1:
                 # Normal data
-                sector_data = data[pos:pos + sector_size]
+                sector_data = view[pos:pos + sector_size]
                 pos += sector_size
             elif stype == 2:
                 # Compressed (all same byte)
                 fill = data[pos]
                 pos += 1
-                sector_data = bytes([fill]) * sector_size
+                sector_data = fill_cache.get(fill) or fill_cache.setdefault(fill, bytes((fill,)) * sector_size)
             else:
                 # Other types (deleted, errors) - treat as normal
                 if stype in [3, 4, 5, 6, 7, 8]:
                     if stype in [1, 3, 5, 7]:
-                        sector_data = data[pos:pos + sector_size]
+                        sector_data = view[pos:pos + sector_size]
                         pos += sector_size
                     else:
                         fill = data[pos]
                         pos += 1
-                        sector_data = bytes([fill]) * sector_size
+                        sector_data = fill_cache.get(fill) or fill_cache.setdefault(fill, bytes((fill,)) * sector_size)
                 else:
-                    sector_data = b'\xe5' * sector_size
+                    sector_data = unavailable
 
-            sectors[sector_map[i]] = sector_data
+            sec_num = sector_map[i]
+            if sectors[sec_num] is None:
+                order.append(sec_num)
+            sectors[sec_num] = sector_data
 
         tracks.append({
             'cyl': cyl,
             'head': head,
             'sectors': sectors,
+            'order': order,
             'sector_size': sector_size,
             'num_sectors': num_sectors
         })
@@ -125,18 +139,37 @@ def imd_to_raw(imd_file, raw_file):
 
     # Create raw image
     total_size = (max_cyl + 1) * (max_head + 1) * sectors_per_track * sector_size
-    image = bytearray(b'\xe5' * total_size)
+    image = bytearray(b'\xe5') * total_size  # one allocation, no bytes temporary
 
+    image_size = len(image)
+    track_size = sectors_per_track * sector_size
     for track in tracks:
         cyl = track['cyl']
         head = track['head']
 
-        for sec_num, sec_data in track['sectors'].items():
+        # Sectors go in the order their numbers first appear in the file:
+        # where two land on the same bytes (sectors 0 and 1 of a zero-based
+        # track, or sectors larger than track 0's), the later one wins.
+        # When no two can overlap the order doesn't matter, and they go in
+        # destination order so the track's window fills front to back.
+        # Offsets are sector_size steps from the track's base, computed
+        # once per track
+        track_base = (cyl * (max_head + 1) + head) * track_size
+        sectors = track['sectors']
+        if track['sector_size'] <= sector_size and (sectors[0] is None or len(sectors) < 2
+                                                     or sectors[1] is None):
+            numbers = range(len(sectors))
+        else:
+            numbers = track['order']
+        for sec_num in numbers:
+            sec_data = sectors[sec_num]
+            if sec_data is None:
+                continue
             # Calculate offset (sectors typically numbered 1-N)
             sec_idx = sec_num - 1 if sec_num > 0 else sec_num
-            offset = ((cyl * (max_head + 1) + head) * sectors_per_track + sec_idx) * sector_size
+            offset = track_base + sec_idx * sector_size
 
-            if offset + len(sec_data) <= len(image):
+            if offset + len(sec_data) <= image_size:
                 image[offset:offset + len(sec_data)] = sec_data
 
     with open(raw_file, 'wb') as f:
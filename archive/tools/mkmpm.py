@@ -15,6 +15,13 @@ For bank-switched MP/M II with common base at 8000H:
 import struct
 import sys
 import os
+import shutil
+
+# '0'/'1' characters -> 0/1 bytes, for unpacking the relocation bitmap via bin()
+BIT_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+
+# SPR header words: base address, code length in pages
+SPR_HEADER = struct.Struct('<HH')
 
 def read_spr(filename, target_addr=None):
     """Read an SPR file and return (base_addr, code)
@@ -32,12 +39,11 @@ def read_spr(filename, target_addr=None):
         data = f.read()
 
     # SPR header
-    base = struct.unpack('<H', data[0:2])[0]
-    code_pages = struct.unpack('<H', data[2:4])[0]
+    base, code_pages = SPR_HEADER.unpack_from(data, 0)
     code_len = code_pages * 256  # Convert pages to bytes
 
     # Code starts at offset 256
-    code = bytearray(data[256:256+code_len])
+    code = data[256:256+code_len]
 
     # Relocation bitmap follows the code (1 bit per code byte)
     bitmap_start = 256 + code_len
@@ -53,21 +59,31 @@ def read_spr(filename, target_addr=None):
 
         # Each bit in the bitmap indicates if the corresponding byte needs relocation
         # The byte is the HIGH byte of an address that needs adjustment
-        reloc_count = 0
-        for byte_idx in range(code_len):
-            bitmap_byte = byte_idx // 8
-            bitmap_bit = byte_idx % 8
-            if bitmap_byte < len(reloc_bitmap):
-                if reloc_bitmap[bitmap_byte] & (0x80 >> bitmap_bit):
-                    # This byte is a high byte of an address - adjust it
-                    old_val = code[byte_idx]
-                    new_val = (old_val + delta_pages) & 0xFF
-                    code[byte_idx] = new_val
-                    reloc_count += 1
+        # The bitmap covers whole pages (one bit per code byte), so the number
+        # of address bytes is just its population count
+        nbits = len(reloc_bitmap) * 8
+        bits = int.from_bytes(reloc_bitmap, 'big')
+        reloc_count = bin(bits).count('1')
+
+        # A sub-page delta leaves every high byte as it is: skip the add
+        if reloc_count and delta_pages:
+            # Expand the bitmap (MSB first) to one 0/1 byte per code byte
+            flags = format(bits, f'0{nbits}b').encode('ascii').translate(BIT_FLAGS)[:code_len]
+
+            # Add delta_pages to every flagged byte at once, treating the code as
+            # one big integer: the low 7 bits of each byte are added with no carry
+            # into the next byte, then bit 7 is fixed up with an XOR
+            # (the result is built as new bytes, so the code is never copied
+            # into a mutable buffer first)
+            n = len(flags)
+            x = int.from_bytes(code[:n], 'big')
+            y = int.from_bytes(flags, 'big') * (delta_pages & 0xFF)
+            low = int.from_bytes(b'\x7f' * n, 'big')
+            code = (((x & low) + (y & low)) ^ ((x ^ y) & ~low)).to_bytes(n, 'big') + code[n:]
 
         print(f"    Relocated {reloc_count} address bytes")
 
-    return base, bytes(code)
+    return base, code
 
 def main():
     # Paths relative to project
@@ -197,17 +213,16 @@ def main():
     # BNKXIOS at CD00H forwards BIOS calls to the emulator XIOS at 8800H
     print()
     print("Generating BNKXIOS forwarding stubs:")
-    bnkxios_code = bytearray()
     xios_base = 0x8800  # Emulator XIOS address
-    for i in range(30):  # 30 BIOS entry points (3 bytes each = 90 bytes)
-        target = xios_base + i * 3
-        bnkxios_code.append(0xC3)  # JP
-        bnkxios_code.append(target & 0xFF)  # Low byte
-        bnkxios_code.append((target >> 8) & 0xFF)  # High byte
+    # 30 BIOS entry points (3 bytes each = 90 bytes): JP, low byte, high byte,
+    # packed as one interleaved table in a single call
+    fields = []
+    for i in range(30):
+        fields += (0xC3, xios_base + i * 3)
+    bnkxios_code = struct.pack('<' + 'BH' * 30, *fields)
     # Pad to 256 bytes
-    while len(bnkxios_code) < 256:
-        bnkxios_code.append(0x00)
-    place(0xCD00, bytes(bnkxios_code), "BNKXIOS (generated)")
+    bnkxios_code = bnkxios_code.ljust(256, b'\x00')
+    place(0xCD00, bnkxios_code, "BNKXIOS (generated)")
 
     print()
     print("Loading DAT files (zeroed for now):")
@@ -265,11 +280,14 @@ def main():
     print(f"Output: {output_path}")
     print(f"Size: {256 + len(mem)} bytes")
 
-    # Also copy to MPM.SYS
+    # Also copy to MPM.SYS (hard link where the filesystem allows it)
     mpm_dest = os.path.join(disks_dir, 'MPM.SYS')
-    with open(mpm_dest, 'wb') as f:
-        f.write(header_ba)
-        f.write(mem)
+    if os.path.lexists(mpm_dest):
+        os.unlink(mpm_dest)
+    try:
+        os.link(output_path, mpm_dest)
+    except OSError:
+        shutil.copyfile(output_path, mpm_dest)
     print(f"Copied to: {mpm_dest}")
 
 if __name__ == '__main__':
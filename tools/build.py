@@ -9,16 +9,31 @@ Builds MP/M II from source using:
 - GENMOD: Creates relocatable files (.PRL/.RSP/.SPR)
 
 Usage:
-    python build.py [--clean] [--verbose] [target...]
+    python build.py [--clean] [--verbose] [--force] [-j N] [target...]
+
+Targets whose sources, included files, tools and settings are unchanged
+since their last successful build are skipped (see Builder.target_digest).
+While tools/watch_daemon.py is running, clean targets are recognised from its
+change journal without reading their sources (see Builder.journal_clean).
 """
 
 import os
+import re
 import sys
+import hashlib
 import subprocess
 import shutil
 import argparse
+import contextlib
+import dataclasses
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 # ============================================================================
@@ -51,6 +66,26 @@ INCLUDE_PATHS = [
     SRC_ROOT / "NUCLEUS",
 ]
 
+# Fixed tool argv prefixes, built once
+_UM80_PREFIX = [UM80] + [arg for inc in INCLUDE_PATHS for arg in ("-I", str(inc))]
+_UPLM80_PREFIX = [UPLM80, "-I", str(SRC_ROOT / "UTIL8")]  # include path for .LIT files
+
+# Per-target content digests used to skip up-to-date targets
+DIGEST_DIR = BUILD_DIR / "digests"
+HASH_CACHE_FILE = BUILD_DIR / ".hashcache.json"
+
+# Change journal kept by tools/watch_daemon.py (see Builder.journal_clean)
+WATCH_JOURNAL = BUILD_DIR / ".dirty"
+WATCH_PIDFILE = BUILD_DIR / ".watch.pid"
+WATCH_SYNC_PREFIX = ".watch-sync-"
+
+# Content-addressed .REL cache shared by all targets (see Builder.object_key)
+OBJ_CACHE_DIR = BUILD_DIR / "objcache"
+
+# Implicit dependencies: PL/M "$include (file)" and assembler "maclib name"
+PLM_INCLUDE_RE = re.compile(rb'^\$include\s*\(\s*([^)\s]+)\s*\)', re.IGNORECASE | re.MULTILINE)
+MACLIB_RE = re.compile(rb'^\s*maclib\s+(\w+)', re.IGNORECASE | re.MULTILINE)
+
 # ============================================================================
 # Build Target Definitions
 # ============================================================================
@@ -67,6 +102,14 @@ class BuildTarget:
     plm_mode: str = "cpm"        # PLM mode: "cpm" (default) or "bare"
     skip_runtime: bool = False   # If True, don't link with cpm_runtime
     post_build: Optional[str] = None  # Special post-build action (e.g., "mpmldr")
+    # Derived from sources once at construction (used by --list / --asm-only)
+    has_plm: bool = field(init=False, repr=False, compare=False)
+    asm_only: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        suffixes = [s.upper().rsplit(".", 1)[-1] for s in self.sources]
+        self.has_plm = "PLM" in suffixes
+        self.asm_only = all(suf in ("ASM", "MAC") for suf in suffixes)
 
 # Source files that produce differently-named binaries
 NAME_MAPPING = {
@@ -179,6 +222,9 @@ MPMLDR_TARGETS = [
 # The extracted LDRBDOS is identical between V2.0 and V2.1 MPMLDR.COM.
 LDRBDOS_BIN = BUILD_DIR / "MPMLDR" / "ldrbdos.bin"
 DRI_MPMLDR = SRC_ROOT / "MPMLDR" / "MPMLDR.COM"
+# LDRBDOS is at 0xD00 in memory, file starts at 0x100, so offset = 0xD00 - 0x100 = 0xC00
+LDRBDOS_OFFSET = 0xD00 - 0x100
+LDRBDOS_SIZE = 0xA80  # Size extracted during investigation
 
 # ============================================================================
 # NUCLEUS - Kernel SPR files
@@ -255,9 +301,174 @@ ALL_TARGETS = (
 # Build Functions
 # ============================================================================
 
+def include_names(path: Path, data: bytes) -> list:
+    """Names of files a source pulls in via $include (PL/M) or maclib (ASM)"""
+    if path.suffix.upper() == ".PLM":
+        return [m.decode('latin-1') for m in PLM_INCLUDE_RE.findall(data)]
+    return [m.decode('latin-1') + ".LIB" for m in MACLIB_RE.findall(data)]
+
+class _HashCache:
+    """
+    Persistent path -> (mtime, size, sha256, includes) map.
+
+    A file is only read and rehashed when its st_mtime_ns or st_size differ
+    from the cached entry, so a warm no-op build costs one stat per file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = None
+        self.dirty = False
+        self.updated = {}  # entries (re)hashed since loading, for merge()
+
+    def _load(self):
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _entry(self, path: Path) -> dict:
+        if self.entries is None:
+            self._load()
+        st = path.stat()
+        key = str(path)
+        entry = self.entries.get(key)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry
+        data = path.read_bytes()
+        entry = {
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "includes": include_names(path, data),
+        }
+        self.entries[key] = entry
+        self.updated[key] = entry
+        self.dirty = True
+        return entry
+
+    def get(self, path: Path) -> str:
+        """SHA-256 of a file's contents"""
+        return self._entry(path)["sha256"]
+
+    def includes(self, path: Path) -> list:
+        """Include/maclib names referenced by a source file"""
+        return self._entry(path)["includes"]
+
+    def cached_includes(self, path: Path) -> Optional[list]:
+        """Includes from the last time the file was hashed, without a stat"""
+        if self.entries is None:
+            self._load()
+        entry = self.entries.get(str(path))
+        return entry["includes"] if entry else None
+
+    def merge(self, entries: dict):
+        """Take over entries hashed by another cache (a worker's updated)"""
+        if not entries:
+            return
+        if self.entries is None:
+            self._load()
+        self.entries.update(entries)
+        self.dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+def read_watch_journal(timeout: float = 1.0) -> Optional[tuple]:
+    """
+    (watcher start time, {path: last change time}) from tools/watch_daemon.py,
+    or None if no watcher is running or it doesn't respond within timeout.
+
+    Creates a sync file in BUILD_DIR and waits for the watcher to journal
+    it; inotify delivers events in order, so every change made before the
+    call is in the journal by then.
+    """
+    try:
+        pid, watch_start = map(int, WATCH_PIDFILE.read_text().split())
+        os.kill(pid, 0)
+    except PermissionError:
+        pass  # alive, owned by someone else
+    except (OSError, ValueError):
+        return None
+
+    sync_file = BUILD_DIR / f"{WATCH_SYNC_PREFIX}{os.getpid()}-{time.time_ns()}"
+    marker = f" !sync {sync_file.name}\n"
+    deadline = time.monotonic() + timeout
+    sync_file.touch()
+    try:
+        while True:
+            try:
+                text = WATCH_JOURNAL.read_text(errors="surrogateescape")
+            except OSError:
+                return None
+            if marker in text:
+                break
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0.002)
+    finally:
+        sync_file.unlink(missing_ok=True)
+
+    events = {}
+    for line in text.splitlines(keepends=True):
+        stamp, _, path = line.partition(" ")
+        if not line.endswith("\n") or not stamp.isdigit() or path.startswith("!"):
+            continue
+        path = path[:-1]
+        events[path] = max(events.get(path, 0), int(stamp))
+    return watch_start, events
+
+_tool_stamp = None
+
+def tool_stamp() -> str:
+    """Short fingerprint of the installed tool binaries (path, mtime, size)"""
+    global _tool_stamp
+    if _tool_stamp is None:
+        h = hashlib.sha256()
+        for tool in (UM80, UL80, UPLM80):
+            path = shutil.which(tool)
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+            h.update(repr((path, st and st.st_mtime_ns, st and st.st_size)).encode())
+        _tool_stamp = h.hexdigest()[:16]
+    return _tool_stamp
+
+_tool_versions = {}
+
+def tool_version(tool: str) -> str:
+    """Return the tool's --version output (memoized), or "" if unavailable"""
+    if tool not in _tool_versions:
+        try:
+            # No stdin and a short timeout, in case a tool ignores --version
+            # and waits for input
+            result = subprocess.run([tool, "--version"], stdin=subprocess.DEVNULL,
+                                    capture_output=True, text=True, timeout=10)
+            _tool_versions[tool] = (result.stdout + result.stderr).strip()
+        except (OSError, subprocess.TimeoutExpired):
+            _tool_versions[tool] = ""
+    return _tool_versions[tool]
+
 class Builder:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, jobs=None, force=False, tool_slots=None):
         self.verbose = verbose
+        self.jobs = jobs or os.cpu_count() or 1
+        # Held while a tool runs; in worker processes, a semaphore shared by
+        # all of them keeps the total number of running tools within --jobs
+        self.tool_slots = tool_slots or contextlib.nullcontext()
+        self.force = force
+        self.hash_cache = _HashCache(HASH_CACHE_FILE)
+        self._dir_files = {}
+        self.runtime_ready = False
         self.build_dir = BUILD_DIR
         self.output_dir = OUTPUT_DIR
 
@@ -269,29 +480,35 @@ class Builder:
             print(f"  {msg}")
 
     def run(self, cmd, cwd=None):
-        """Run a command and return success status"""
+        """
+        Run a command and return success status.
+
+        stdout goes straight to the terminal in verbose mode and is discarded
+        otherwise; only stderr is captured, for reporting failures.
+        """
         self.debug(f"Running: {' '.join(cmd)}")
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=cwd,
-                capture_output=True,
-                text=True
-            )
-            if result.returncode != 0:
-                print(f"ERROR: {' '.join(cmd)}")
-                print(result.stderr)
+        with self.tool_slots:
+            try:
+                result = subprocess.run(
+                    cmd,
+                    cwd=cwd,
+                    stdout=None if self.verbose else subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
+                )
+            except Exception as e:
+                print(f"EXCEPTION: {e}")
                 return False
-            if self.verbose and result.stdout:
-                print(result.stdout)
-            return True
-        except Exception as e:
-            print(f"EXCEPTION: {e}")
+        if result.returncode != 0:
+            print(f"ERROR: {' '.join(cmd)}")
+            print(result.stderr.decode(errors='replace'))
             return False
+        return True
 
     def setup_dirs(self):
         """Create build directories"""
         self.build_dir.mkdir(parents=True, exist_ok=True)
+        DIGEST_DIR.mkdir(parents=True, exist_ok=True)
+        OBJ_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     def clean(self):
@@ -302,40 +519,298 @@ class Builder:
             shutil.rmtree(self.output_dir)
         self.log("Cleaned build directories")
 
+    def dir_files(self, directory: Path) -> dict:
+        """Regular files in a directory by name; one scandir per directory"""
+        files = self._dir_files.get(directory)
+        if files is None:
+            try:
+                with os.scandir(directory) as it:
+                    files = {e.name: directory / e.name for e in it if e.is_file()}
+            except FileNotFoundError:
+                files = {}
+            self._dir_files[directory] = files
+        return files
+
+    def resolve_sources(self, target: BuildTarget) -> dict:
+        """Map each source name to its path (None if missing); local overrides win"""
+        local_files = self.dir_files(LOCAL_SRC_ROOT / target.directory)
+        orig_files = self.dir_files(SRC_ROOT / target.directory)
+        return {src: local_files.get(src) or orig_files.get(src) for src in target.sources}
+
+    def source_deps(self, target: BuildTarget, src_path: Path, names=None) -> list:
+        """Files pulled in by a source via $include or maclib"""
+        if names is None:
+            names = self.hash_cache.includes(src_path)
+        if src_path.suffix.upper() == ".PLM":
+            search = [src_path.parent, SRC_ROOT / target.directory, SRC_ROOT / "UTIL8"]
+        else:
+            search = [src_path.parent, SRC_ROOT / target.directory] + INCLUDE_PATHS
+        deps = []
+        for name in names:
+            for d in search:
+                files = self.dir_files(d)
+                found = files.get(name) or files.get(name.upper())
+                if found:
+                    deps.append(found)
+                    break
+        return deps
+
+    def output_path(self, target: BuildTarget) -> Path:
+        return self.output_dir / f"{target.name}.{target.output_type.upper()}"
+
+    def digest_path(self, target: BuildTarget) -> Path:
+        return DIGEST_DIR / f".{target.name}.{target.output_type.upper()}.digest"
+
+    def target_digest(self, target: BuildTarget) -> Optional[str]:
+        """
+        SHA-256 over everything that determines a target's output: the
+        target definition, tool paths and versions, include paths, and the
+        contents of every source and file it includes. Returns None if a
+        source is missing (the build will report it).
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps({
+            "target": dataclasses.asdict(target),
+            "tools": {tool: tool_version(tool) for tool in (UM80, UL80, UPLM80)},
+            "include_paths": [str(p) for p in INCLUDE_PATHS],
+        }, sort_keys=True).encode())
+
+        files = self.input_files(target)
+        if files is None:
+            return None
+        for f in files:
+            h.update(f"{f}\0{self.hash_cache.get(f)}\n".encode())
+        return h.hexdigest()
+
+    def input_files(self, target: BuildTarget, cached: bool = False) -> Optional[list]:
+        """
+        Every file the target's output is built from. Returns None if a
+        source is missing, or with cached=True if a source's includes aren't
+        in the hash cache yet (cached=True never stats or opens a source).
+        """
+        files = []
+        for src_path in self.resolve_sources(target).values():
+            if src_path is None:
+                return None
+            names = self.hash_cache.cached_includes(src_path) if cached else None
+            if cached and names is None:
+                return None
+            files.append(src_path)
+            files.extend(self.source_deps(target, src_path, names))
+        if not target.skip_runtime:
+            files.append(CPM_RUNTIME_SRC)
+        if target.post_build == "mpmldr":
+            files.append(DRI_MPMLDR)
+        return files
+
+    def up_to_date(self, target: BuildTarget, digest: Optional[str]) -> bool:
+        """True if the target's output exists and was built from this digest"""
+        if self.force or digest is None:
+            return False
+        digest_file = self.digest_path(target)
+        if not digest_file.exists() or not self.output_path(target).exists():
+            return False
+        return digest_file.read_text().split()[:1] == [digest]
+
+    def record_digest(self, target: BuildTarget, digest: Optional[str], ok: bool,
+                      started_ns: int = 0):
+        """
+        Store the digest of a successful build, drop it after a failure.
+        started_ns is when the inputs were hashed; changes journaled after
+        it make the target dirty again (see journal_clean).
+        """
+        digest_file = self.digest_path(target)
+        if ok and digest is not None:
+            digest_file.write_text(f"{digest} {started_ns} {tool_stamp()}\n")
+        else:
+            digest_file.unlink(missing_ok=True)
+
+    def journal_clean(self, target: BuildTarget, journal: Optional[tuple]) -> bool:
+        """
+        True if the watcher's journal proves the target clean: its last
+        good build was hashed while the watcher was running, and none of
+        its inputs (or this script) has been touched since. Decided from
+        the digest file alone, without stat'ing or hashing any source.
+        """
+        if self.force or journal is None:
+            return False
+        watch_start, events = journal
+        try:
+            fields = self.digest_path(target).read_text().split()
+        except OSError:
+            return False
+        if len(fields) != 3 or fields[2] != tool_stamp():
+            return False
+        built = int(fields[1])
+        if built < watch_start or events.get("*", 0) >= built:
+            return False
+        files = self.input_files(target, cached=True)
+        if files is None or not self.output_path(target).exists():
+            return False
+        files.append(Path(__file__))
+        for f in files:
+            try:
+                key = f.relative_to(PROJECT_ROOT).as_posix()
+            except ValueError:
+                return False
+            if events.get(key, 0) >= built:
+                return False
+        return True
+
+    def obj_dir(self, target: BuildTarget) -> Path:
+        """
+        Per-target directory for intermediates, mirroring the source layout.
+        Keeps e.g. DDT's and RDT's DDT0MOV.REL, or the two ABORT.REL files,
+        from overwriting each other.
+        """
+        return self.build_dir / target.directory / target.name
+
+    def rel_path(self, target: BuildTarget, src: str) -> Path:
+        """Intermediate .REL path for one source of a target"""
+        if target.concat and len(target.sources) > 1:
+            return self.obj_dir(target) / f"{target.name}.REL"
+        return self.obj_dir(target) / (Path(src).stem + ".REL")
+
+    def intermediates(self, target: BuildTarget) -> set:
+        """Files under BUILD_DIR that building this target writes"""
+        paths = {self.rel_path(target, src) for src in target.sources}
+        paths.add(self.obj_dir(target) / ".flags")
+        if target.concat and len(target.sources) > 1:
+            paths.add(self.obj_dir(target) / f"{target.name}.ASM")
+        for src in target.sources:
+            if src.upper().endswith(".PLM"):
+                paths.add(self.rel_path(target, src).with_suffix(".MAC"))
+        if target.post_build == "mpmldr":
+            paths.add(LDRBDOS_BIN)
+        return paths
+
+    def object_flags(self, target: BuildTarget) -> dict:
+        """
+        Settings that change a target's intermediates without touching any
+        source mtime: "plm" for the .MAC files uplm80 writes, "asm" for the
+        .REL files from um80. The mtime gates in build_target/compile_plm
+        only apply while these match the ones the files were built with.
+        """
+        return {
+            "plm": {"mode": target.plm_mode, "uplm80": tool_version(UPLM80)},
+            "asm": {"include_paths": [str(p) for p in INCLUDE_PATHS],
+                    "um80": tool_version(UM80)},
+        }
+
+    def is_fresh(self, output: Path, inputs: list) -> bool:
+        """Make rule: output exists and is no older than any of its inputs"""
+        if self.force or not output.exists():
+            return False
+        out_mtime = output.stat().st_mtime_ns
+        return all(out_mtime >= p.stat().st_mtime_ns for p in inputs)
+
+    def object_key(self, target: BuildTarget, src_path: Path) -> str:
+        """
+        Cache key for the .REL built from one source: its name and contents,
+        the contents of everything it includes, the include paths, and the
+        tool versions (plus the PL/M mode for .PLM sources). Identical
+        sources in different targets (DDT/RDT) map to the same key.
+        """
+        h = hashlib.sha256()
+        h.update(f"{src_path.name}\0{self.hash_cache.get(src_path)}\n".encode())
+        for dep in self.source_deps(target, src_path):
+            h.update(f"{dep.name}\0{self.hash_cache.get(dep)}\n".encode())
+        h.update(repr([str(p) for p in INCLUDE_PATHS]).encode())
+        h.update(tool_version(UM80).encode())
+        if src_path.suffix.upper() == ".PLM":
+            h.update(f"{tool_version(UPLM80)}\0{target.plm_mode}".encode())
+        return h.hexdigest()
+
+    def cached_object(self, target: BuildTarget, src_path: Path) -> Path:
+        """Object cache entry for one source (may not exist yet)"""
+        return OBJ_CACHE_DIR / (self.object_key(target, src_path) + ".rel")
+
+    def build_object(self, target: BuildTarget, src_path: Path, rel_path: Path,
+                     reuse_mac: bool = False) -> bool:
+        """
+        Produce rel_path from src_path, reusing a cached .REL with the same
+        object_key if one exists. Cache entries are hard links, so a hit
+        costs one link() and no tool invocation. reuse_mac lets a PL/M
+        source keep a .MAC that is newer than it and its includes.
+        """
+        cached = self.cached_object(target, src_path)
+
+        # Never let a tool write through a hard link into the cache
+        rel_path.unlink(missing_ok=True)
+
+        if cached.exists():
+            self.debug(f"Cached: {rel_path.name}")
+            _link_or_copy(cached, rel_path)
+            os.utime(rel_path)
+            return True
+
+        if src_path.suffix.upper() in (".ASM", ".MAC"):
+            ok = self.assemble(src_path, rel_path)
+        elif src_path.suffix.upper() == ".PLM":
+            deps = [src_path] + self.source_deps(target, src_path) if reuse_mac else None
+            ok = self.compile_plm(src_path, rel_path, target.plm_mode, deps)
+        else:
+            self.log(f"  ERROR: Unknown source type: {src_path.name}")
+            return False
+
+        if ok and rel_path.exists():
+            # Publish atomically; concurrent workers may race on the same key
+            tmp = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            _link_or_copy(rel_path, tmp)
+            os.replace(tmp, cached)
+        return ok
+
+    def build_runtime(self) -> bool:
+        """Build the CP/M runtime library unless it is up to date (once per run)"""
+        if self.runtime_ready or self.is_fresh(CPM_RUNTIME_REL, [CPM_RUNTIME_SRC]):
+            self.runtime_ready = True
+            return True
+        self.debug("Building CP/M runtime library...")
+        if not self.assemble(CPM_RUNTIME_SRC, CPM_RUNTIME_REL):
+            self.log("  ERROR: Failed to build CP/M runtime")
+            return False
+        self.runtime_ready = True
+        return True
+
     def assemble(self, asm_file: Path, rel_file: Path) -> bool:
         """Assemble a .ASM file to .REL using um80"""
-        cmd = [UM80]
-
-        # Add include paths
-        for inc in INCLUDE_PATHS:
-            cmd.extend(["-I", str(inc)])
+        return self.run(_UM80_PREFIX + ["-o", str(rel_file), str(asm_file)])
 
-        cmd.extend(["-o", str(rel_file), str(asm_file)])
+    def plm_command(self, plm_file: Path, rel_file: Path, mode: str = "cpm") -> list:
+        """uplm80 command line compiling plm_file to the .MAC beside rel_file"""
+        # Generate intermediate .MAC file next to the .REL
+        mac_file = rel_file.with_suffix(".MAC")
 
-        return self.run(cmd)
+        mode_args = ["--mode", "bare"] if mode == "bare" else []
+        return _UPLM80_PREFIX + mode_args + ["-o", str(mac_file), str(plm_file)]
 
-    def compile_plm(self, plm_file: Path, rel_file: Path, mode: str = "cpm") -> bool:
+    def compile_plm(self, plm_file: Path, rel_file: Path, mode: str = "cpm",
+                    mac_deps: Optional[list] = None) -> bool:
         """Compile a .PLM file to .REL using uplm80 + um80
 
         uplm80 compiles .PLM -> .MAC (assembly)
         um80 assembles .MAC -> .REL
 
+        Each step is skipped when its output is newer than its inputs, so
+        e.g. an um80 upgrade re-assembles without re-running uplm80.
+
         Args:
             mode: "cpm" (default) or "bare" for bare-metal startup
+            mac_deps: files the .MAC depends on (the .PLM and its includes);
+                None to always recompile
         """
-        # Generate intermediate .MAC file
-        mac_file = self.build_dir / (plm_file.stem + ".MAC")
+        mac_file = rel_file.with_suffix(".MAC")
 
         # Step 1: Compile PLM to MAC
-        # Add include path for .LIT files
-        cmd = [UPLM80, "-I", str(SRC_ROOT / "UTIL8")]
-        if mode == "bare":
-            cmd.extend(["--mode", "bare"])
-        cmd.extend(["-o", str(mac_file), str(plm_file)])
-        if not self.run(cmd):
+        if mac_deps is not None and self.is_fresh(mac_file, mac_deps):
+            self.debug(f"Up to date: {mac_file.name}")
+        elif not self.run(self.plm_command(plm_file, rel_file, mode)):
             return False
 
         # Step 2: Assemble MAC to REL
+        if self.is_fresh(rel_file, [mac_file]):
+            self.debug(f"Up to date: {rel_file.name}")
+            return True
         return self.assemble(mac_file, rel_file)
 
     def link(self, rel_files: list, output_file: Path, output_type: str, origin: str = None) -> bool:
@@ -357,98 +832,120 @@ class Builder:
         """Build a single target"""
         self.log(f"Building {target.name}.{target.output_type}...")
 
-        # Determine source directories (local overrides take precedence)
         src_dir = SRC_ROOT / target.directory
-        local_src_dir = LOCAL_SRC_ROOT / target.directory
+        self.obj_dir(target).mkdir(parents=True, exist_ok=True)
 
         # Compile/assemble each source file
         rel_files = []
         all_success = True
+        src_paths_by_name = self.resolve_sources(target)
+
+        # Objects built with other flags are stale whatever their mtimes
+        flags = self.object_flags(target)
+        flags_file = self.obj_dir(target) / ".flags"
+        try:
+            old_flags = json.loads(flags_file.read_text())
+        except (OSError, ValueError):
+            old_flags = {}
+        flags_match = old_flags == flags
+        reuse_mac = old_flags.get("plm") == flags["plm"]
+        if not flags_match:
+            flags_file.unlink(missing_ok=True)
 
         # Handle concatenated sources (multiple files -> single assembly)
         if target.concat and len(target.sources) > 1:
-            # Concatenate all source files into one
-            concat_content = []
+            src_paths = []
             for src in target.sources:
-                local_src_path = local_src_dir / src
-                orig_src_path = src_dir / src
-                if local_src_path.exists():
-                    src_path = local_src_path
-                    self.debug(f"Using local override: {src_path}")
-                elif orig_src_path.exists():
-                    src_path = orig_src_path
-                else:
-                    self.log(f"  ERROR: Source file not found: {orig_src_path}")
-                    return False
-                try:
-                    content = src_path.read_text(encoding='latin-1')
-                    # Strip trailing Control-Z (CP/M EOF marker) characters
-                    content = content.rstrip('\x1a')
-                    concat_content.append(content)
-                except Exception as e:
-                    self.log(f"  ERROR: Failed to read {src_path}: {e}")
+                src_path = src_paths_by_name[src]
+                if src_path is None:
+                    self.log(f"  ERROR: Source file not found: {src_dir / src}")
                     return False
+                if src_path.is_relative_to(LOCAL_SRC_ROOT):
+                    self.debug(f"Using local override: {src_path}")
+                src_paths.append(src_path)
 
-            # Write concatenated file
-            concat_file = self.build_dir / f"{target.name}.ASM"
-            concat_file.write_text('\n'.join(concat_content), encoding='latin-1')
-
-            # Assemble concatenated file
-            rel_path = self.build_dir / f"{target.name}.REL"
-            if self.assemble(concat_file, rel_path):
+            rel_path = self.rel_path(target, target.sources[0])
+            deps = [d for sp in src_paths for d in [sp] + self.source_deps(target, sp)]
+            if flags_match and self.is_fresh(rel_path, deps):
+                self.debug(f"Up to date: {rel_path.name}")
                 rel_files.append(rel_path)
-            else:
-                return False
+                src_paths = []
+
+            if src_paths:
+                # Concatenate all source files into one, newline-separated,
+                # copying file data kernel-side where possible
+                concat_file = self.obj_dir(target) / f"{target.name}.ASM"
+                out_fd = os.open(concat_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    for i, src_path in enumerate(src_paths):
+                        if i:
+                            _write_all(out_fd, b'\n')
+                        try:
+                            _append_source(out_fd, src_path)
+                        except OSError as e:
+                            self.log(f"  ERROR: Failed to read {src_path}: {e}")
+                            return False
+                finally:
+                    os.close(out_fd)
+
+                # Assemble concatenated file
+                if self.assemble(concat_file, rel_path):
+                    rel_files.append(rel_path)
+                else:
+                    return False
         else:
             # Normal case: process each source file separately
+            jobs = []
             for src in target.sources:
-                # Check local source directory first, then original
-                local_src_path = local_src_dir / src
-                orig_src_path = src_dir / src
-                if local_src_path.exists():
-                    src_path = local_src_path
-                    self.debug(f"Using local override: {src_path}")
-                elif orig_src_path.exists():
-                    src_path = orig_src_path
-                else:
-                    self.log(f"  ERROR: Source file not found: {orig_src_path}")
+                src_path = src_paths_by_name[src]
+                if src_path is None:
+                    self.log(f"  ERROR: Source file not found: {src_dir / src}")
                     all_success = False
                     continue
+                if src_path.is_relative_to(LOCAL_SRC_ROOT):
+                    self.debug(f"Using local override: {src_path}")
 
-                rel_name = Path(src).stem + ".REL"
-                rel_path = self.build_dir / rel_name
-
-                if src.upper().endswith(".ASM") or src.upper().endswith(".MAC"):
-                    if self.assemble(src_path, rel_path):
-                        rel_files.append(rel_path)
-                    else:
-                        all_success = False
-                elif src.upper().endswith(".PLM"):
-                    if self.compile_plm(src_path, rel_path, target.plm_mode):
-                        rel_files.append(rel_path)
-                    else:
-                        all_success = False
-                else:
-                    self.log(f"  ERROR: Unknown source type: {src}")
+                rel_path = self.rel_path(target, src)
+                rel_files.append(rel_path)
+
+                # Skip sources whose .REL is newer than the source and its includes
+                if flags_match and self.is_fresh(rel_path,
+                                                 [src_path] + self.source_deps(target, src_path)):
+                    self.debug(f"Up to date: {rel_path.name}")
+                    continue
+                jobs.append((src_path, rel_path))
+
+            # Modules are independent until link time, so build them on up to
+            # self.jobs threads (the work happens in child processes, so the
+            # GIL isn't a bottleneck). This also overlaps one PL/M file's
+            # uplm80 run with another's um80 run. rel_files keeps source
+            # order for the linker.
+            if len(jobs) > 1 and self.jobs > 1:
+                with ThreadPoolExecutor(max_workers=min(self.jobs, len(jobs))) as executor:
+                    results = list(executor.map(
+                        lambda job: self.build_object(target, *job, reuse_mac), jobs))
+            else:
+                results = [self.build_object(target, *job, reuse_mac) for job in jobs]
+            for (src_path, rel_path), ok in zip(jobs, results):
+                if not ok:
+                    rel_files.remove(rel_path)
                     all_success = False
 
         if not rel_files:
             self.log(f"  ERROR: No object files produced for {target.name}")
             return False
+        if all_success and not flags_match:
+            flags_file.write_text(json.dumps(flags, sort_keys=True) + "\n")
 
         # Include the CP/M runtime library (provides standard CP/M symbols)
         # unless skip_runtime is set (e.g., for MPMLDR which has its own BDOS)
         if not target.skip_runtime:
-            # Build runtime if needed
-            if not CPM_RUNTIME_REL.exists():
-                self.debug("Building CP/M runtime library...")
-                if not self.assemble(CPM_RUNTIME_SRC, CPM_RUNTIME_REL):
-                    self.log("  ERROR: Failed to build CP/M runtime")
-                    return False
+            if not self.build_runtime():
+                return False
             rel_files.append(CPM_RUNTIME_REL)
 
         # Link
-        output_file = self.output_dir / f"{target.name}.{target.output_type.upper()}"
+        output_file = self.output_path(target)
         if not self.link(rel_files, output_file, target.output_type, target.origin):
             return False
 
@@ -476,22 +973,19 @@ class Builder:
         mpmldr_build_dir = self.build_dir / "MPMLDR"
         mpmldr_build_dir.mkdir(parents=True, exist_ok=True)
 
-        # Extract LDRBDOS from DRI's MPMLDR.COM if not already done
-        if not LDRBDOS_BIN.exists():
+        # Extract LDRBDOS from DRI's MPMLDR.COM unless a complete, current copy exists
+        if not DRI_MPMLDR.exists():
+            self.log(f"  ERROR: DRI MPMLDR.COM not found: {DRI_MPMLDR}")
+            return False
+        if not (self.is_fresh(LDRBDOS_BIN, [DRI_MPMLDR])
+                and LDRBDOS_BIN.stat().st_size == LDRBDOS_SIZE):
             self.debug("Extracting LDRBDOS from DRI MPMLDR.COM...")
-            if not DRI_MPMLDR.exists():
-                self.log(f"  ERROR: DRI MPMLDR.COM not found: {DRI_MPMLDR}")
-                return False
 
-            # Read DRI MPMLDR.COM and extract LDRBDOS (at offset 0xC00, length 0xA80)
+            # Read only LDRBDOS (at offset 0xC00, length 0xA80) from DRI MPMLDR.COM
             # The binary loads at 0x100, so LDRBDOS at 0xD00 is at file offset 0xC00
             try:
                 with open(DRI_MPMLDR, 'rb') as f:
-                    data = f.read()
-                # LDRBDOS is at 0xD00 in memory, file starts at 0x100, so offset = 0xD00 - 0x100 = 0xC00
-                ldrbdos_offset = 0xD00 - 0x100
-                ldrbdos_size = 0xA80  # Size extracted during investigation
-                ldrbdos_data = data[ldrbdos_offset:ldrbdos_offset + ldrbdos_size]
+                    ldrbdos_data = os.pread(f.fileno(), LDRBDOS_SIZE, LDRBDOS_OFFSET)
                 with open(LDRBDOS_BIN, 'wb') as f:
                     f.write(ldrbdos_data)
                 self.debug(f"Extracted {len(ldrbdos_data)} bytes of LDRBDOS")
@@ -499,31 +993,57 @@ class Builder:
                 self.log(f"  ERROR: Failed to extract LDRBDOS: {e}")
                 return False
 
-        # Use dri_patch tool to combine main code with LDRBDOS
-        dri_patch = Path(__file__).parent / "dri_patch.py"
-        if not dri_patch.exists():
-            self.log(f"  ERROR: dri_patch tool not found: {dri_patch}")
-            return False
-
-        # Create a backup of the original linked output
-        linked_output = output_file.with_suffix('.linked')
-        shutil.copy(output_file, linked_output)
-
-        # Combine: base at 0x100, LDRBDOS at 0xD00
-        cmd = [
-            "python3", str(dri_patch),
-            "--base", f"{linked_output}@0x100",
-            "--patch", f"0xD00:{LDRBDOS_BIN}",
-            "-o", str(output_file)
-        ]
-
-        if not self.run(cmd):
-            self.log("  ERROR: Failed to combine MPMLDR with LDRBDOS")
+        # Combine in memory: base at 0x100, LDRBDOS at 0xD00 (file offset 0xC00),
+        # zero-filling any gap between the end of the linked code and LDRBDOS
+        try:
+            linked = output_file.read_bytes()
+            ldrbdos_data = LDRBDOS_BIN.read_bytes()
+            if self.verbose:
+                # Keep the unpatched link output around for debugging
+                output_file.with_suffix('.linked').write_bytes(linked)
+            combined = bytearray(linked)
+            end = LDRBDOS_OFFSET + len(ldrbdos_data)
+            if len(combined) < end:
+                combined.extend(bytes(end - len(combined)))
+            combined[LDRBDOS_OFFSET:end] = ldrbdos_data
+            output_file.write_bytes(combined)
+        except OSError as e:
+            self.log(f"  ERROR: Failed to combine MPMLDR with LDRBDOS: {e}")
             return False
 
         self.debug("Combined MPMLDR with LDRBDOS")
         return True
 
+    def dependencies(self, targets) -> list:
+        """
+        Build-order edges between targets: deps[i] is the set of indices of
+        earlier targets that target i must wait for.
+
+        A target waits for an earlier one if both write the same intermediate
+        file, or if they share a source with the same object_key (DDT and RDT):
+        the later one then links the cached .REL instead of assembling it a
+        second time in parallel.
+        """
+        deps = [set() for _ in targets]
+        writers = {}
+        key_owners = {}
+        for i, target in enumerate(targets):
+            for path in self.intermediates(target):
+                if path in writers:
+                    deps[i].add(writers[path])
+                writers[path] = i
+            if target.concat and len(target.sources) > 1:
+                continue
+            for src_path in self.resolve_sources(target).values():
+                if src_path is None:
+                    continue
+                key = self.object_key(target, src_path)
+                if key in key_owners:
+                    deps[i].add(key_owners[key])
+                else:
+                    key_owners[key] = i
+        return deps
+
     def build_all(self, targets=None):
         """Build all or specified targets"""
         self.setup_dirs()
@@ -535,16 +1055,171 @@ class Builder:
         fail_count = 0
         skip_count = 0
 
+        # Shared prerequisites are built once up front so workers never race on them
+        if any(not t.skip_runtime for t in targets) and not self.build_runtime():
+            return False
+
+        # Skip targets whose inputs haven't changed since their last good
+        # build: from the watcher's journal when one is running, otherwise
+        # (or when the journal can't tell) by content digest
+        started = time.time_ns()
+        journal = None if self.force else read_watch_journal()
+        digests = {}
+        stale = []
         for target in targets:
-            if self.build_target(target):
+            if self.journal_clean(target, journal):
+                self.debug(f"Up to date: {target.name}.{target.output_type} (journal)")
+                skip_count += 1
+                continue
+            digest = self.target_digest(target)
+            if self.up_to_date(target, digest):
+                self.debug(f"Up to date: {target.name}.{target.output_type}")
+                skip_count += 1
+                if journal is not None:
+                    # Restamp so the journal can vouch for it next time
+                    self.record_digest(target, digest, True, started)
+            else:
+                digests[id(target)] = digest
+                stale.append(target)
+        targets = stale
+        # Let the workers start from the freshly updated hashes
+        self.hash_cache.save()
+
+        results = []
+        if self.jobs > 1 and len(targets) > 1:
+            # Dependency-driven scheduling: a target is submitted as soon as
+            # the targets it depends on have finished, so e.g. one target's
+            # PL/M compiles overlap another's link instead of waiting for a
+            # whole batch to drain.
+            deps = self.dependencies(targets)
+            waiting = list(range(len(targets)))
+            finished = set()
+            failed = set()
+            running = {}
+            # Workers and their module threads share self.jobs tool slots
+            tool_slots = multiprocessing.BoundedSemaphore(self.jobs)
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                     initargs=(tool_slots,)) as executor:
+                while waiting or running:
+                    ready = [i for i in waiting if deps[i] <= finished]
+                    # A target that waited on a failed one fails with it rather
+                    # than rebuilding the shared objects itself
+                    blocked = [i for i in ready if deps[i] & failed]
+                    if blocked:
+                        for i in blocked:
+                            waiting.remove(i)
+                            target, cause = targets[i], targets[min(deps[i] & failed)]
+                            self.log(f"  ERROR: {target.name}.{target.output_type}: not built, "
+                                     f"{cause.name}.{cause.output_type} failed")
+                            failed.add(i)
+                            finished.add(i)
+                            results.append((target, False))
+                        continue
+                    if ready:
+                        # Module threads per worker: an even share of the jobs
+                        # between the targets running once these start
+                        share = max(1, self.jobs // (len(running) + len(ready)))
+                    for i in ready:
+                        waiting.remove(i)
+                        future = executor.submit(_build_one, targets[i], self.verbose,
+                                                 share, self.force)
+                        running[future] = i
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = running.pop(future)
+                        target = targets[i]
+                        try:
+                            ok, hashes = future.result()
+                            self.hash_cache.merge(hashes)
+                        except Exception as e:
+                            self.log(f"  ERROR: {target.name}.{target.output_type}: {e}")
+                            ok = False
+                        finished.add(i)
+                        if not ok:
+                            failed.add(i)
+                        results.append((target, ok))
+        else:
+            results = [(target, self.build_target(target)) for target in targets]
+
+        for target, ok in results:
+            self.record_digest(target, digests[id(target)], ok, started)
+            if ok:
                 success_count += 1
             else:
                 fail_count += 1
 
+        self.hash_cache.save()
+
         self.log("")
         self.log(f"Build complete: {success_count} succeeded, {fail_count} failed, {skip_count} skipped")
         return fail_count == 0
 
+
+def _write_all(fd: int, data: bytes):
+    """os.write until everything is written"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _append_source(out_fd: int, src_path: Path):
+    """
+    Append a source file to out_fd without its trailing Control-Z (CP/M EOF
+    marker) padding. The ^Z run is found by reading backwards from the end;
+    the remainder is copied with os.sendfile, or read()/write() where
+    sendfile to a regular file isn't supported.
+    """
+    in_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        size = os.fstat(in_fd).st_size
+        while size:
+            chunk = os.pread(in_fd, min(size, 128), size - min(size, 128))
+            stripped = chunk.rstrip(b'\x1a')
+            size -= len(chunk) - len(stripped)
+            if stripped:
+                break
+        offset = 0
+        if hasattr(os, "sendfile"):
+            try:
+                while offset < size:
+                    sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                pass
+        if offset < size:
+            _write_all(out_fd, os.pread(in_fd, size - offset, offset))
+    finally:
+        os.close(in_fd)
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-link src to dst, falling back to a copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+_worker_tool_slots = None
+
+def _init_worker(tool_slots):
+    """Worker initializer: keep the pool-wide tool semaphore"""
+    global _worker_tool_slots
+    _worker_tool_slots = tool_slots
+
+def _build_one(target: BuildTarget, verbose: bool, jobs: int, force: bool) -> tuple:
+    """
+    Worker entry point: build one target in a fresh Builder. Returns
+    (success, hash cache entries the worker computed), so the parent can
+    save them with its own.
+    """
+    builder = Builder(verbose=verbose, jobs=jobs, force=force, tool_slots=_worker_tool_slots)
+    builder.runtime_ready = True  # build_all builds it before starting workers
+    ok = builder.build_target(target)
+    return ok, builder.hash_cache.updated
+
 # ============================================================================
 # Main
 # ============================================================================
@@ -553,13 +1228,20 @@ def main():
     parser = argparse.ArgumentParser(description="Build MP/M II from source")
     parser.add_argument("--clean", action="store_true", help="Clean build directories")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="Rebuild targets even if they are up to date")
     parser.add_argument("--list", action="store_true", help="List all targets")
     parser.add_argument("--asm-only", action="store_true", help="Build only ASM targets (skip PL/M)")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Number of targets to build in parallel (default: CPU count)")
     parser.add_argument("targets", nargs="*", help="Specific targets to build")
 
     args = parser.parse_args()
 
-    builder = Builder(verbose=args.verbose)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    builder = Builder(verbose=args.verbose, jobs=args.jobs, force=args.force)
 
     if args.clean:
         builder.clean()
@@ -568,15 +1250,13 @@ def main():
     if args.list:
         print("Available targets:")
         for t in ALL_TARGETS:
-            plm_flag = " [PLM]" if any(s.upper().endswith(".PLM") for s in t.sources) else ""
+            plm_flag = " [PLM]" if t.has_plm else ""
             print(f"  {t.name}.{t.output_type} <- {', '.join(t.sources)}{plm_flag}")
         return 0
 
     # Filter to ASM-only if requested
     if args.asm_only:
-        targets = [t for t in ALL_TARGETS
-                   if all(s.upper().endswith(".ASM") or s.upper().endswith(".MAC")
-                          for s in t.sources)]
+        targets = [t for t in ALL_TARGETS if t.asm_only]
     elif args.targets:
         target_names = [t.upper() for t in args.targets]
         targets = [t for t in ALL_TARGETS if t.name.upper() in target_names]
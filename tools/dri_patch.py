@@ -34,63 +34,190 @@ SPDX-License-Identifier: GPL-3.0-or-later
 import argparse
 import sys
 import os
+import re
+import mmap
+import binascii
+import struct
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import zlib
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
+# Unprefixed hex number such as "1A00" (not "1a00h" or "0x1A00")
+HEX_NUMBER_RE = re.compile(r'[0-9A-Fa-f]+')
+
+# Intel HEX record: ':' first on its line (after optional blanks), then the
+# hex digits and whatever else is left of the line (normally blanks or \r)
+HEX_RECORD_RE = re.compile(rb'^[ \t\r\f\v]*:([0-9A-Fa-f]*)([^\n]*)', re.MULTILINE)
+
+# Record header: byte count, 16-bit big-endian address, record type
+HEX_HEADER = struct.Struct('>BHB')
+
+# Parsed HEX files are cached here, keyed by path, mtime and size.
+# Entry layout: header (magic, base, span), then span data bytes and span
+# coverage bytes. Bump the magic when parse results could change.
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'dri_patch'
+CACHE_HEADER = struct.Struct('<4sqq')
+CACHE_MAGIC = b'DPH1'
+
+# Below this much HEX input, starting worker processes costs more than
+# parsing the files one after another
+PARALLEL_HEX_BYTES = 1 << 20
+
+
+@dataclass
+class Image:
+    """
+    Memory image: data[i] is the byte at address base + i, and cov[i] is 1
+    where that byte was actually loaded (0 in gaps between records, where
+    data is always 0).
+    """
+    base: int = 0
+    data: bytearray = field(default_factory=bytearray)
+    cov: bytearray = field(default_factory=bytearray)
+
+    @classmethod
+    def from_runs(cls, runs: list[tuple[int, bytes]], min_addr: int, max_addr: int) -> 'Image':
+        """Build an image spanning min_addr..max_addr from (addr, bytes) runs."""
+        span = max_addr - min_addr + 1
+        data = bytearray(span)
+        cov = bytearray(span)
+        # Back-to-back runs (consecutive HEX records) share one coverage fill
+        cov_start = cov_end = 0
+        for addr, chunk in runs:
+            off = addr - min_addr
+            end = off + len(chunk)
+            data[off:end] = chunk
+            if off != cov_end:
+                cov[cov_start:cov_end] = b'\x01' * (cov_end - cov_start)
+                cov_start = off
+            cov_end = end
+        cov[cov_start:cov_end] = b'\x01' * (cov_end - cov_start)
+        return cls(min_addr, data, cov)
+
+    @classmethod
+    def from_bytes(cls, addr: int, data: bytearray) -> 'Image':
+        """Image of one contiguous block (takes ownership of data)."""
+        return cls(addr, data, bytearray(b'\x01') * len(data))
+
+    def __len__(self) -> int:
+        """Number of loaded bytes."""
+        return self.cov.count(1)
+
+    def write(self, addr: int, chunk: bytes):
+        """Store chunk at addr, growing the image as needed."""
+        if not chunk:
+            return
+        if not self.data:
+            self.base = addr
+        elif addr < self.base:
+            pad = bytes(self.base - addr)
+            self.data[:0] = pad
+            self.cov[:0] = pad
+            self.base = addr
+        off = addr - self.base
+        end = off + len(chunk)
+        if end > len(self.data):
+            grow = bytes(end - len(self.data))
+            self.data += grow
+            self.cov += grow
+        self.data[off:end] = chunk
+        self.cov[off:end] = b'\x01' * len(chunk)
+
+    def spans(self):
+        """
+        Yield (start, end) data offsets of each contiguous stretch of loaded
+        bytes. Gaps are skipped with bytearray.find, not byte by byte.
+        """
+        cov = self.cov
+        start = cov.find(1)
+        while start >= 0:
+            end = cov.find(0, start)
+            if end < 0:
+                end = len(cov)
+            yield start, end
+            start = cov.find(1, end)
+
+    def runs(self):
+        """Yield (addr, bytes) for each contiguous stretch of loaded bytes."""
+        for start, end in self.spans():
+            yield self.base + start, self.data[start:end]
+
+
+@lru_cache(maxsize=256)
 def parse_hex_address(s: str) -> int:
     """Parse hex or decimal address string."""
     s = s.strip()
-    if s.startswith('0x') or s.startswith('0X'):
+    if s.startswith(('0x', '0X')):
         return int(s, 16)
-    elif s.endswith('h') or s.endswith('H'):
+    elif s.endswith(('h', 'H')):
         return int(s[:-1], 16)
-    elif all(c in '0123456789abcdefABCDEF' for c in s) and any(c in 'abcdefABCDEF' for c in s):
+    elif HEX_NUMBER_RE.fullmatch(s) and not s.isdigit():
         # Looks like hex without prefix
         return int(s, 16)
     else:
         return int(s, 0)  # Auto-detect base
 
 
-def parse_intel_hex(data: bytes) -> tuple[dict[int, int], int, int]:
+def record_sum(record: bytes) -> int:
+    """Low byte of the sum of all bytes in a record (0 for a valid record)."""
+    # The low half of Adler-32 is 1 + sum(bytes) mod 65521: the exact sum
+    # for up to 256 bytes, computed in C without an int object per byte.
+    # Records with a byte count above 251 would wrap, so they use sum().
+    if len(record) <= 256:
+        return ((zlib.adler32(record) & 0xFFFF) - 1) & 0xFF
+    return sum(record) & 0xFF
+
+
+def line_number(data: bytes, pos: int) -> int:
+    """1-based line number of offset pos (only needed for error messages)."""
+    return data.count(b'\n', 0, pos) + 1
+
+
+def parse_intel_hex(data: bytes) -> tuple[Image, int, int]:
     """
     Parse Intel HEX format.
-    Returns (address_to_byte_dict, min_addr, max_addr)
+    Returns (image, min_addr, max_addr)
     """
-    result = {}
-    min_addr = None
-    max_addr = None
+    runs = []
     extended_addr = 0
 
-    lines = data.decode('ascii', errors='ignore').split('\n')
+    # One scan over the raw bytes finds every record; other lines are ignored
+    records = list(HEX_RECORD_RE.finditer(data))
 
-    for line_num, line in enumerate(lines, 1):
-        line = line.strip()
-        if not line:
-            continue
-        if not line.startswith(':'):
-            continue
+    # Well-formed files (even digit counts, nothing but blanks after them)
+    # are decoded with a single unhexlify call; otherwise each record is
+    # decoded on its own so errors point at the offending line.
+    decoded = None
+    if all(not (m.end(1) - m.start(1)) & 1 and (not m.group(2) or m.group(2).isspace())
+           for m in records):
+        decoded = memoryview(binascii.unhexlify(b''.join(m.group(1) for m in records)))
+    pos = 0
 
+    for m in records:
         try:
             # Parse Intel HEX record
-            hex_data = bytes.fromhex(line[1:])
-            byte_count = hex_data[0]
-            address = (hex_data[1] << 8) | hex_data[2]
-            record_type = hex_data[3]
+            if decoded is not None:
+                end = pos + (m.end(1) - m.start(1)) // 2
+                hex_data = decoded[pos:end]
+                pos = end
+            else:
+                hex_data = bytes.fromhex((m.group(1) + m.group(2)).decode('ascii', errors='ignore'))
+            byte_count, address, record_type = HEX_HEADER.unpack_from(hex_data)
 
             # Verify checksum
-            checksum = sum(hex_data) & 0xFF
-            if checksum != 0:
-                raise ValueError(f"Line {line_num}: Bad checksum")
+            if record_sum(hex_data) != 0:
+                raise ValueError(f"Line {line_number(data, m.start())}: Bad checksum")
 
             if record_type == 0x00:  # Data record
                 full_addr = extended_addr + address
-                for i, byte in enumerate(hex_data[4:4+byte_count]):
-                    addr = full_addr + i
-                    result[addr] = byte
-                    if min_addr is None or addr < min_addr:
-                        min_addr = addr
-                    if max_addr is None or addr > max_addr:
-                        max_addr = addr
+                chunk = hex_data[4:4+byte_count]
+                if chunk:
+                    runs.append((full_addr, chunk))
 
             elif record_type == 0x01:  # EOF
                 break
@@ -102,61 +229,157 @@ def parse_intel_hex(data: bytes) -> tuple[dict[int, int], int, int]:
                 extended_addr = ((hex_data[4] << 8) | hex_data[5]) << 16
 
         except Exception as e:
-            raise ValueError(f"Line {line_num}: {e}")
+            raise ValueError(f"Line {line_number(data, m.start())}: {e}")
 
-    if not result:
+    if not runs:
         raise ValueError("No data records found in Intel HEX file")
 
-    return result, min_addr or 0, max_addr or 0
+    # Bounds in one pass over the runs rather than branches per record
+    min_addr = min(addr for addr, _ in runs)
+    max_addr = max(addr + len(chunk) for addr, chunk in runs) - 1
+
+    return Image.from_runs(runs, min_addr, max_addr), min_addr, max_addr
 
 
-def load_intel_hex(filepath: Path) -> tuple[dict[int, int], int, int]:
-    """Load Intel HEX file and return (addr_to_byte, min_addr, max_addr)."""
+def load_intel_hex(filepath: Path) -> tuple[Image, int, int]:
+    """
+    Load Intel HEX file and return (image, min_addr, max_addr).
+    Results are memoized in CACHE_DIR, so an unchanged file isn't reparsed.
+    """
     with open(filepath, 'rb') as f:
-        return parse_intel_hex(f.read())
+        st = os.fstat(f.fileno())
+        key = hashlib.blake2b(f"{os.path.abspath(filepath)}|{st.st_mtime_ns}|{st.st_size}"
+                              .encode(), digest_size=16).hexdigest()
+        cache_file = CACHE_DIR / f"{key}.bin"
 
+        image = load_cached_image(cache_file)
+        if image is None:
+            image, _, _ = parse_intel_hex(f.read())
+            save_cached_image(cache_file, image)
+    return image, image.base, image.base + len(image.data) - 1
 
-def load_binary(filepath: Path, offset: int = 0) -> tuple[dict[int, int], int, int]:
-    """Load binary file at given offset."""
+
+def load_intel_hex_files(paths: list[Path]) -> list:
+    """
+    load_intel_hex for several files, in worker processes if they are big.
+    A file that fails to load gives its exception in place of a result.
+    """
+    workers = min(4, len(paths), os.cpu_count() or 1)
+    if workers >= 2 and sum(p.stat().st_size for p in paths) >= PARALLEL_HEX_BYTES:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(try_load_intel_hex, paths))
+    return [try_load_intel_hex(p) for p in paths]
+
+
+def looks_like_hex(filepath: Path) -> bool:
+    """True if the file's first non-blank byte is ':' (an Intel HEX record)."""
     with open(filepath, 'rb') as f:
-        data = f.read()
+        return f.read(256).lstrip()[:1] == b':'
+
+
+def try_load_intel_hex(filepath: Path):
+    """load_intel_hex, returning the exception instead of raising it."""
+    try:
+        return load_intel_hex(filepath)
+    except Exception as e:
+        return e
+
+
+def load_cached_image(cache_file: Path):
+    """Image stored by save_cached_image, or None if missing or unusable."""
+    try:
+        blob = cache_file.read_bytes()
+        magic, base, span = CACHE_HEADER.unpack_from(blob)
+    except (OSError, struct.error):
+        return None
+    start = CACHE_HEADER.size
+    if magic != CACHE_MAGIC or len(blob) != start + 2 * span:
+        return None
+    return Image(base, bytearray(blob[start:start + span]), bytearray(blob[start + span:]))
+
+
+def save_cached_image(cache_file: Path, image: Image):
+    """Store an image in the parse cache (best effort)."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, image.base, len(image.data)))
+            f.write(image.data)
+            f.write(image.cov)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+
+
+def read_region(filepath: Path, start: int = None, end: int = None) -> bytearray:
+    """
+    Return bytes start:end of a file (slice semantics). The file is mapped
+    rather than read, so only the region is copied, once. The result never
+    aliases the file, which may be overwritten afterwards (e.g. -o same file).
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # empty file, pipe, ...
+            return bytearray(f.read()[start:end])
+        with mm, memoryview(mm) as view:
+            region = view[start:end]
+            try:
+                return bytearray(region)
+            finally:
+                region.release()
+
 
-    result = {}
-    for i, byte in enumerate(data):
-        result[offset + i] = byte
+def load_binary(filepath: Path, offset: int = 0) -> tuple[bytearray, int, int]:
+    """Load binary file at given offset; returns (data, min_addr, max_addr)."""
+    data = read_region(filepath)
 
     min_addr = offset
     max_addr = offset + len(data) - 1 if data else offset
-    return result, min_addr, max_addr
-
-
-def dict_to_binary(addr_dict: dict[int, int], start: int, size: int, fill: int = 0) -> bytes:
-    """Convert address dictionary to binary, filling gaps."""
-    result = bytearray([fill] * size)
-    for addr, byte in addr_dict.items():
-        idx = addr - start
-        if 0 <= idx < size:
-            result[idx] = byte
+    return data, min_addr, max_addr
+
+
+def image_to_binary(image: Image, start: int, size: int, fill: int = 0) -> bytes:
+    """Convert image to binary, filling gaps."""
+    result = bytearray([fill]) * size
+    shift = image.base - start  # image offset -> result offset
+
+    # Copy the part of the image inside the output window in one go, then
+    # put the fill byte back into gaps (which hold 0 in the image)
+    lo = max(0, -shift)
+    hi = min(len(image.data), size - shift)
+    if lo < hi:
+        with memoryview(image.data) as view:
+            result[lo + shift:hi + shift] = view[lo:hi]
+        if fill:
+            cov = image.cov
+            gap = cov.find(0, lo, hi)
+            while gap >= 0:
+                end = cov.find(1, gap, hi)
+                if end < 0:
+                    end = hi
+                result[gap + shift:end + shift] = bytearray([fill]) * (end - gap)
+                gap = cov.find(0, end, hi)
     return bytes(result)
 
 
-def apply_patch(base: dict[int, int], patch: dict[int, int],
+def apply_patch(image: Image, patch,
                 overflow_error: bool = True, verbose: bool = False,
-                max_addr: int = None) -> dict[int, int]:
-    """Apply patch to base, optionally checking for overflow."""
-    result = base.copy()
-
-    for addr, byte in patch.items():
-        if max_addr is not None and addr > max_addr:
-            msg = f"Patch address 0x{addr:04X} exceeds max 0x{max_addr:04X}"
+                max_addr: int = None):
+    """
+    Apply patch, an iterable of (addr, bytes) runs, to image in place,
+    optionally checking for overflow.
+    """
+    for addr, chunk in patch:
+        if max_addr is not None and addr + len(chunk) - 1 > max_addr:
+            msg = f"Patch address 0x{max(addr, max_addr + 1):04X} exceeds max 0x{max_addr:04X}"
             if overflow_error:
                 raise ValueError(msg)
             else:
                 print(f"Warning: {msg}", file=sys.stderr)
-                continue
-        result[addr] = byte
-
-    return result
+                chunk = chunk[:max(0, max_addr + 1 - addr)]
+        image.write(addr, chunk)
 
 
 def extract_region(data: bytes, start: int, end: int) -> bytes:
@@ -164,48 +387,31 @@ def extract_region(data: bytes, start: int, end: int) -> bytes:
     return data[start:end]
 
 
-def write_intel_hex(addr_dict: dict[int, int], filepath: Path,
+def write_intel_hex(image: Image, filepath: Path,
                     bytes_per_line: int = 16):
-    """Write address dictionary as Intel HEX file."""
-    if not addr_dict:
-        with open(filepath, 'w') as f:
-            f.write(":00000001FF\n")  # EOF record
-        return
-
-    min_addr = min(addr_dict.keys())
-    max_addr = max(addr_dict.keys())
-
-    with open(filepath, 'w') as f:
-        addr = min_addr
-        while addr <= max_addr:
-            # Collect bytes for this line
-            line_bytes = []
-            line_start = addr
-            while addr <= max_addr and len(line_bytes) < bytes_per_line:
-                if addr in addr_dict:
-                    line_bytes.append(addr_dict[addr])
-                else:
-                    # Gap - end this line
-                    if line_bytes:
-                        break
-                    # Skip gap
-                    addr += 1
-                    line_start = addr
-                    continue
-                addr += 1
-
-            if line_bytes:
-                # Write data record
-                byte_count = len(line_bytes)
-                addr_hi = (line_start >> 8) & 0xFF
-                addr_lo = line_start & 0xFF
-                record = [byte_count, addr_hi, addr_lo, 0x00] + line_bytes
-                checksum = (-sum(record)) & 0xFF
-                hex_str = ''.join(f'{b:02X}' for b in record) + f'{checksum:02X}'
-                f.write(f":{hex_str}\n")
-
-        # EOF record
-        f.write(":00000001FF\n")
+    """Write image as Intel HEX file."""
+    lines = []
+    data = image.data
+    # Records never span a gap
+    for start, end in image.spans():
+        for i in range(start, end, bytes_per_line):
+            line_start = image.base + i
+            line_bytes = data[i:min(i + bytes_per_line, end)]
+
+            # Data record
+            byte_count = len(line_bytes)
+            addr_hi = (line_start >> 8) & 0xFF
+            addr_lo = line_start & 0xFF
+            record = bytes([byte_count, addr_hi, addr_lo, 0x00]) + line_bytes
+            checksum = (-record_sum(record)) & 0xFF
+            lines.append(b':%s%02X\n' % (binascii.hexlify(record).upper(), checksum))
+
+    # EOF record
+    lines.append(b':00000001FF\n')
+
+    # Bytes straight to the file: no text encoding or newline translation
+    with open(filepath, 'wb') as f:
+        f.write(b''.join(lines))
 
 
 def main():
@@ -278,17 +484,18 @@ Examples:
             print(f"\n=== {filepath} ===")
             print(f"Size: {filepath.stat().st_size} bytes")
 
-            # Try to parse as Intel HEX
-            try:
-                addr_dict, min_addr, max_addr = load_intel_hex(filepath)
+            # Parse as Intel HEX if it starts like one
+            result = try_load_intel_hex(filepath) if looks_like_hex(filepath) else None
+            if isinstance(result, tuple):
+                image, min_addr, max_addr = result
                 print(f"Format: Intel HEX")
                 print(f"Address range: 0x{min_addr:04X} - 0x{max_addr:04X}")
-                print(f"Data bytes: {len(addr_dict)}")
+                print(f"Data bytes: {len(image)}")
                 print(f"Span: {max_addr - min_addr + 1} bytes")
-            except:
+            else:
                 # Binary file
                 with open(filepath, 'rb') as f:
-                    data = f.read()
+                    data = f.read(16)
                 print(f"Format: Binary")
                 print(f"First bytes: {data[:16].hex()}")
         return 0
@@ -310,10 +517,7 @@ Examples:
             print(f"Error: Invalid extract range '{args.extract}'", file=sys.stderr)
             return 1
 
-        with open(args.input[0], 'rb') as f:
-            data = f.read()
-
-        extracted = data[start:end]
+        extracted = read_region(args.input[0], start, end)
         if args.verbose:
             print(f"Extracting 0x{start:04X}:0x{end:04X} ({len(extracted)} bytes)")
 
@@ -329,7 +533,7 @@ Examples:
         return 1
 
     # Start with empty or base
-    combined = {}
+    combined = Image()
     global_min = None
     global_max = None
 
@@ -354,35 +558,31 @@ Examples:
             print(f"Error: Base file not found: {base_file}", file=sys.stderr)
             return 1
 
-        # Try Intel HEX first, fall back to binary
-        try:
-            combined, min_a, max_a = load_intel_hex(base_path)
+        # Intel HEX if it starts like one (and parses), otherwise binary
+        result = try_load_intel_hex(base_path) if looks_like_hex(base_path) else None
+        if isinstance(result, tuple):
+            combined, min_a, max_a = result
             if args.verbose:
                 print(f"Loaded base HEX: {base_file} (0x{min_a:04X}-0x{max_a:04X})")
-        except:
-            combined, min_a, max_a = load_binary(base_path, offset)
+        else:
+            data, min_a, max_a = load_binary(base_path, offset)
+            combined = Image.from_bytes(offset, data)
             if args.verbose:
                 print(f"Loaded base binary: {base_file} at 0x{offset:04X} ({max_a - min_a + 1} bytes)")
 
         update_bounds(min_a, max_a)
 
-    # Add Intel HEX files
+    # Collect the --hex, --patch, --copy and input operations in the order
+    # they are applied (later ones win), checking specs and paths first so
+    # every HEX file can be parsed in one batch
+    ops = []
     for hex_file in args.hex:
         hex_path = Path(hex_file)
         if not hex_path.exists():
             print(f"Error: HEX file not found: {hex_file}", file=sys.stderr)
             return 1
+        ops.append(('hex', hex_file, hex_path))
 
-        addr_dict, min_a, max_a = load_intel_hex(hex_path)
-        if args.verbose:
-            print(f"Adding HEX: {hex_file} (0x{min_a:04X}-0x{max_a:04X}, {len(addr_dict)} bytes)")
-
-        combined = apply_patch(combined, addr_dict,
-                               overflow_error=(args.overflow == 'error'),
-                               verbose=args.verbose)
-        update_bounds(min_a, max_a)
-
-    # Add binary patches
     for patch_spec in args.patch:
         try:
             addr_str, file_path = patch_spec.split(':', 1)
@@ -395,17 +595,8 @@ Examples:
         if not patch_path.exists():
             print(f"Error: Patch file not found: {file_path}", file=sys.stderr)
             return 1
+        ops.append(('patch', file_path, patch_path, addr))
 
-        addr_dict, min_a, max_a = load_binary(patch_path, addr)
-        if args.verbose:
-            print(f"Adding patch: {file_path} at 0x{addr:04X} ({max_a - min_a + 1} bytes)")
-
-        combined = apply_patch(combined, addr_dict,
-                               overflow_error=(args.overflow == 'error'),
-                               verbose=args.verbose)
-        update_bounds(min_a, max_a)
-
-    # Process --copy operations (copy bytes from source file to dest offset)
     for copy_spec in args.copy:
         try:
             # Parse SRC:SRCOFF:LEN@DSTOFF format
@@ -428,48 +619,77 @@ Examples:
         if not src_path.exists():
             print(f"Error: Source file not found: {src_file}", file=sys.stderr)
             return 1
+        ops.append(('copy', src_file, src_path, src_off, length, dst_off))
 
-        # Read bytes from source file
-        with open(src_path, 'rb') as f:
-            f.seek(src_off)
-            src_bytes = f.read(length)
-
-        if len(src_bytes) < length:
-            print(f"Warning: Only read {len(src_bytes)} bytes from {src_file} "
-                  f"(requested {length})", file=sys.stderr)
-
-        # Create address dict for the copied bytes
-        addr_dict = {}
-        for i, byte in enumerate(src_bytes):
-            addr_dict[dst_off + i] = byte
-
-        if args.verbose:
-            bytes_hex = src_bytes.hex()
-            print(f"Copying {len(src_bytes)} bytes from {src_file}@0x{src_off:X} "
-                  f"to 0x{dst_off:X}: {bytes_hex}")
-
-        combined = apply_patch(combined, addr_dict,
-                               overflow_error=(args.overflow == 'error'),
-                               verbose=args.verbose)
-        update_bounds(dst_off, dst_off + len(src_bytes) - 1)
-
-    # Also process input files as additional hex files (for convenience)
+    # Input files are additional hex files (for convenience)
     for input_file in args.input:
         if not input_file.exists():
             print(f"Error: Input file not found: {input_file}", file=sys.stderr)
             return 1
+        ops.append(('input', input_file, input_file))
+
+    # Parse all HEX files up front, possibly in parallel
+    parsed = iter(load_intel_hex_files([op[2] for op in ops if op[0] in ('hex', 'input')]))
+    overflow_error = (args.overflow == 'error')
+
+    for kind, name, path, *params in ops:
+        if kind in ('hex', 'input'):
+            result = next(parsed)
+            if isinstance(result, Exception):
+                if kind == 'input':
+                    print(f"Error: Could not parse {name} as Intel HEX", file=sys.stderr)
+                    return 1
+                raise result
+            image, min_a, max_a = result
+            if args.verbose:
+                if kind == 'hex':
+                    print(f"Adding HEX: {name} (0x{min_a:04X}-0x{max_a:04X}, {len(image)} bytes)")
+                else:
+                    print(f"Adding HEX: {name} (0x{min_a:04X}-0x{max_a:04X})")
+            if combined.data:
+                apply_patch(combined, image.runs(),
+                            overflow_error=overflow_error, verbose=args.verbose)
+            else:
+                combined = image  # first load: nothing to merge into
+            update_bounds(min_a, max_a)
 
-        try:
-            addr_dict, min_a, max_a = load_intel_hex(input_file)
+        elif kind == 'patch':
+            addr, = params
+            data, min_a, max_a = load_binary(path, addr)
             if args.verbose:
-                print(f"Adding HEX: {input_file} (0x{min_a:04X}-0x{max_a:04X})")
-            combined = apply_patch(combined, addr_dict,
-                                   overflow_error=(args.overflow == 'error'),
-                                   verbose=args.verbose)
+                print(f"Adding patch: {name} at 0x{addr:04X} ({max_a - min_a + 1} bytes)")
+
+            if combined.data:
+                apply_patch(combined, [(addr, data)],
+                            overflow_error=overflow_error, verbose=args.verbose)
+            else:
+                combined = Image.from_bytes(addr, data)
             update_bounds(min_a, max_a)
-        except:
-            print(f"Error: Could not parse {input_file} as Intel HEX", file=sys.stderr)
-            return 1
+
+        elif kind == 'copy':
+            # Copy bytes from source file to dest offset
+            src_off, length, dst_off = params
+
+            # Read bytes from source file (one positioned read where available)
+            with open(path, 'rb') as f:
+                if hasattr(os, 'pread'):
+                    src_bytes = os.pread(f.fileno(), length, src_off)
+                else:
+                    f.seek(src_off)
+                    src_bytes = f.read(length)
+
+            if len(src_bytes) < length:
+                print(f"Warning: Only read {len(src_bytes)} bytes from {name} "
+                      f"(requested {length})", file=sys.stderr)
+
+            if args.verbose:
+                bytes_hex = src_bytes.hex()
+                print(f"Copying {len(src_bytes)} bytes from {name}@0x{src_off:X} "
+                      f"to 0x{dst_off:X}: {bytes_hex}")
+
+            apply_patch(combined, [(dst_off, src_bytes)],
+                        overflow_error=overflow_error, verbose=args.verbose)
+            update_bounds(dst_off, dst_off + len(src_bytes) - 1)
 
     if not combined:
         print("Error: No data to write", file=sys.stderr)
@@ -484,10 +704,16 @@ Examples:
     else:
         output_size = (global_max or 0) - start_addr + 1
 
-    # Check for data outside output range
-    for addr in combined.keys():
-        if addr < start_addr or addr >= start_addr + output_size:
-            msg = f"Data at 0x{addr:04X} outside output range 0x{start_addr:04X}-0x{start_addr + output_size - 1:04X}"
+    # Check for data outside output range, one run at a time
+    end_addr = start_addr + output_size
+    for start, end in combined.spans():
+        lo, hi = combined.base + start, combined.base + end
+        # The parts of the run below and above the output window
+        for a, b in ((lo, min(hi, start_addr)), (max(lo, end_addr), hi)):
+            if a >= b:
+                continue
+            where = f"0x{a:04X}" if b - a == 1 else f"0x{a:04X}-0x{b - 1:04X}"
+            msg = f"Data at {where} outside output range 0x{start_addr:04X}-0x{end_addr - 1:04X}"
             if args.overflow == 'error':
                 print(f"Error: {msg}", file=sys.stderr)
                 return 1
@@ -502,7 +728,7 @@ Examples:
         write_intel_hex(combined, args.output)
         print(f"Wrote Intel HEX to {args.output}")
     else:
-        output_data = dict_to_binary(combined, start_addr, output_size, fill_byte)
+        output_data = image_to_binary(combined, start_addr, output_size, fill_byte)
         with open(args.output, 'wb') as f:
             f.write(output_data)
         print(f"Wrote {len(output_data)} bytes to {args.output}")
@@ -16,6 +16,8 @@ SPDX-License-Identifier: GPL-3.0-or-later
 
 import argparse
 import json
+import mmap
+import os
 import struct
 import sys
 from pathlib import Path
@@ -23,20 +25,86 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple
 
 
+# 16-bit little-endian word, as used throughout SYSTEM.DAT and the modules
+_U16 = struct.Struct('<H')
+
+# SYSTEM.DAT runs filled straight from the configuration (setup_system_data)
+_SYSDAT_CONFIG = struct.Struct('<7B')       # bytes 0-6
+_SYSDAT_TIMING = struct.Struct('<3B')       # bytes 122-124
+_SYSDAT_LIMITS = struct.Struct('<BBH2x5B')  # bytes 187-197
+_MEMSEG = struct.Struct('<4B')              # memory segment: base, size, attrib, bank
+
+# '0'/'1' characters -> 0/1 bytes, for unpacking a bitmap via bin()
+_BIT_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def unpack_bitmap(bitmap: bytes, length: int) -> bytes:
+    """Expand an MSB-first bitmap into one 0/1 byte per bit.
+
+    The result is exactly `length` bytes: truncated, or zero-padded when the
+    bitmap is shorter than length bits.
+    """
+    nbits = len(bitmap) * 8
+    bits = format(int.from_bytes(bitmap, 'big'), f'0{nbits}b') if nbits else ''
+    return bits.encode('ascii').translate(_BIT_FLAGS)[:length].ljust(length, b'\x00')
+
+
+def add_bytes(data: bytes, addend: int) -> bytes:
+    """Bytewise (data[i] + addend byte i) & 0xFF.
+
+    The addend is the big-endian packing of the bytes to add, so a 0/1 flag
+    buffer times base_page adds base_page where the flags are set. Works on
+    the whole buffer as one big integer: the low 7 bits of every byte are
+    added with no carry crossing into the next byte, then bit 7 is fixed up
+    with an XOR.
+    """
+    n = len(data)
+    x = int.from_bytes(data, 'big')
+    low = int.from_bytes(b'\x7f' * n, 'big')
+    return (((x & low) + (addend & low)) ^ ((x ^ addend) & ~low)).to_bytes(n, 'big')
+
+
+def _opcode_table(opcodes) -> bytes:
+    table = bytearray(256)
+    for opcode in opcodes:
+        table[opcode] = 2
+    return bytes(table)
+
+
+# Offset of the address high byte for each Z80 opcode with a 16-bit
+# absolute operand, 0 for everything else (see _relocate_by_instruction)
+_OPC = _opcode_table((
+    0xC3, 0xCD,                                      # JP nn, CALL nn
+    0xC2, 0xCA, 0xD2, 0xDA, 0xE2, 0xEA, 0xF2, 0xFA,  # JP cc,nn
+    0xC4, 0xCC, 0xD4, 0xDC, 0xE4, 0xEC, 0xF4, 0xFC,  # CALL cc,nn
+    0x01, 0x11, 0x21, 0x31,                          # LD rr,nn
+    0x3A, 0x32,                                      # LD A,(nn), LD (nn),A
+    0x2A, 0x22,                                      # LD HL,(nn), LD (nn),HL
+))
+
+# Second bytes of ED-prefixed LD rr,(nn) / LD (nn),rr
+_OPC_ED = frozenset((0x4B, 0x5B, 0x7B, 0x43, 0x53, 0x73))
+
+
 @dataclass
 class SPRModule:
     """Represents a loaded SPR/PRL module."""
     name: str
     path: Path
-    code: bytearray
+    code: bytearray  # memoryview once relocated into a memory image
     psize: int  # Program/code size
     dsize: int  # Data/buffer size
     base: int = 0  # Load address (set during relocation)
+    raw: bytes = field(default=b'', repr=False)  # Whole SPR file, mapped (bitmap source)
 
     @classmethod
     def load(cls, path: Path) -> 'SPRModule':
         """Load an SPR file and extract its header."""
-        data = path.read_bytes()
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):  # empty file, pipe, ...
+                data = f.read()
         if len(data) < 256:
             raise ValueError(f"{path}: File too small for SPR format")
 
@@ -48,8 +116,8 @@ class SPRModule:
         # Bytes 6-127: fill/reserved
         # Bytes 128-255: First 128 bytes of relocation bitmap
 
-        psize = struct.unpack('<H', data[1:3])[0]
-        dsize = struct.unpack('<H', data[4:6])[0]
+        psize = int.from_bytes(data[1:3], 'little')
+        dsize = int.from_bytes(data[4:6], 'little')
 
         # Code starts at byte 256
         code_start = 256
@@ -58,17 +126,18 @@ class SPRModule:
         if len(data) < code_end:
             raise ValueError(f"{path}: File truncated, expected {code_end} bytes, got {len(data)}")
 
-        code = bytearray(data[code_start:code_end])
+        code = bytearray(memoryview(data)[code_start:code_end])
 
         return cls(
             name=path.stem.upper(),
             path=path,
             code=code,
             psize=psize,
-            dsize=dsize
+            dsize=dsize,
+            raw=data
         )
 
-    def get_bitmap(self) -> bytes:
+    def get_bitmap(self) -> memoryview:
         """Extract the relocation bitmap from the SPR file.
 
         PRL/SPR file structure:
@@ -79,16 +148,14 @@ class SPRModule:
         The bitmap has one bit per code byte, MSB-first order.
         Bit 7 of bitmap byte 0 = code byte 0, etc.
         """
-        data = self.path.read_bytes()
-
         # Calculate how many bitmap bytes we need
         bitmap_bytes_needed = (self.psize + 7) // 8
 
         # Bitmap starts immediately after code
         bitmap_start = 256 + self.psize
-        return data[bitmap_start:bitmap_start + bitmap_bytes_needed]
+        return memoryview(self.raw)[bitmap_start:bitmap_start + bitmap_bytes_needed]
 
-    def relocate(self, base_page: int) -> None:
+    def relocate(self, base_page: int, target: Optional[memoryview] = None) -> None:
         """Relocate the module to the given base page address.
 
         Uses the relocation bitmap from the SPR file. Each bit in the bitmap
@@ -97,23 +164,48 @@ class SPRModule:
 
         The bitmap uses MSB-first bit ordering: bit 7 of byte 0 corresponds
         to code byte 0, bit 6 to code byte 1, etc.
+
+        If target is given (psize bytes, typically the module's place in a
+        memory image), the code is moved there and relocated in place, and
+        target becomes self.code so later patches land in it directly.
         """
         self.base = base_page * 256
-        bitmap = self.get_bitmap()
-
-        # Apply bitmap-based relocation
-        for byte_idx in range(self.psize):
-            bitmap_byte = byte_idx // 8
-            bitmap_bit = 7 - (byte_idx % 8)  # MSB-first ordering
-
-            if bitmap_byte < len(bitmap):
-                if bitmap[bitmap_byte] & (1 << bitmap_bit):
-                    # This byte needs relocation - add base page
-                    self.code[byte_idx] = (self.code[byte_idx] + base_page) & 0xFF
-
-    def _relocate_by_instruction(self, base_page: int, already_relocated: set = None) -> None:
+        if target is not None:
+            target[:] = self.code
+            self.code = target
+        if base_page == 0:
+            return  # Loaded at page 0: the code is already correct
+        self._apply_bitmap(self.get_bitmap(), base_page)
+
+    def _apply_bitmap(self, bitmap: bytes, base_page: int) -> None:
+        """Add base_page to every code byte whose bitmap bit is set."""
+        bits = int.from_bytes(bitmap, 'big')
+        if not bits:
+            return  # Nothing to relocate (data-only or position-independent)
+
+        # Zero bitmap bytes at either end leave their 8 code bytes alone, so
+        # only the stretch between the first and last set bits is touched
+        first = len(bitmap) - (bits.bit_length() + 7) // 8
+        last = len(bitmap) - ((bits & -bits).bit_length() - 1) // 8
+        lo, hi = first * 8, min(last * 8, self.psize)
+        if lo >= hi:
+            return
+
+        # Apply bitmap-based relocation: one 0/1 flag per code byte, scaled
+        # to base_page (0/1 bytes times a page number never carry) and added
+        # to the whole stretch at once
+        flags = unpack_bitmap(bitmap[first:last], hi - lo)
+        with memoryview(self.code) as code:
+            relocated = add_bytes(code[lo:hi], int.from_bytes(flags, 'big') * base_page)
+        self.code[lo:hi] = relocated
+
+    def _relocate_by_instruction(self, base_page: int,
+                                 already_relocated: Optional[bytes] = None) -> None:
         """Relocate by scanning for instructions with 16-bit addresses.
 
+        Not used by SystemGenerator: every SPR/PRL module carries a bitmap,
+        which relocate() applies. Kept for modules that lack one.
+
         Z80 instructions that have 16-bit absolute addresses:
         - C3 nn nn: JP nn (unconditional jump)
         - CD nn nn: CALL nn (call subroutine)
@@ -136,10 +228,11 @@ class SPRModule:
 
         Args:
             base_page: The base page to add to addresses
-            already_relocated: Set of byte indices already relocated by bitmap
+            already_relocated: One flag byte per code byte, non-zero where the
+                bitmap already relocated it (e.g. unpack_bitmap of get_bitmap())
         """
         if already_relocated is None:
-            already_relocated = set()
+            already_relocated = bytes(self.psize)
 
         i = 0
         while i < self.psize - 2:
@@ -147,41 +240,18 @@ class SPRModule:
 
             # Check for instructions with absolute addresses
             # The address high byte needs relocation if it's within module range
-            addr_offset = -1  # Offset of high byte from current position
-
-            # JP nn, CALL nn
-            if opcode in (0xC3, 0xCD):
-                addr_offset = 2
-            # Conditional JP cc,nn
-            elif opcode in (0xC2, 0xCA, 0xD2, 0xDA, 0xE2, 0xEA, 0xF2, 0xFA):
-                addr_offset = 2
-            # Conditional CALL cc,nn
-            elif opcode in (0xC4, 0xCC, 0xD4, 0xDC, 0xE4, 0xEC, 0xF4, 0xFC):
-                addr_offset = 2
-            # LD rr,nn (16-bit immediate)
-            elif opcode in (0x01, 0x11, 0x21, 0x31):
-                addr_offset = 2
-            # LD A,(nn), LD (nn),A
-            elif opcode in (0x3A, 0x32):
-                addr_offset = 2
-            # LD HL,(nn), LD (nn),HL
-            elif opcode in (0x2A, 0x22):
-                addr_offset = 2
-            # ED prefix instructions
-            elif opcode == 0xED and i < self.psize - 3:
-                ed_opcode = self.code[i + 1]
-                # LD rr,(nn), LD (nn),rr
-                if ed_opcode in (0x4B, 0x5B, 0x7B, 0x43, 0x53, 0x73):
-                    addr_offset = 3
-                    i += 1  # Skip the ED prefix
-
-            if addr_offset > 0 and i + addr_offset < self.psize:
+            addr_offset = _OPC[opcode]  # Offset of high byte from current position
+
+            # ED prefix instructions: LD rr,(nn), LD (nn),rr
+            if opcode == 0xED and i < self.psize - 3 and self.code[i + 1] in _OPC_ED:
+                addr_offset = 3
+                i += 1  # Skip the ED prefix
+
+            if addr_offset and i + addr_offset < self.psize:
                 high_byte_idx = i + addr_offset
 
                 # Skip if already relocated by bitmap
-                if high_byte_idx not in already_relocated:
-                    # Get the address from the instruction
-                    lo = self.code[i + addr_offset - 1]
+                if not already_relocated[high_byte_idx]:
                     hi = self.code[high_byte_idx]
 
                     # Only relocate if address looks like it's within this module
@@ -273,9 +343,12 @@ class SystemConfig:
         with open(path) as f:
             data = json.load(f)
 
+        # Only configuration fields: hasattr() would also accept (and let a
+        # key overwrite) methods such as to_json
+        fields = cls.__dataclass_fields__
         config = cls()
         for key, value in data.items():
-            if hasattr(config, key):
+            if key in fields:
                 setattr(config, key, value)
 
         return config
@@ -347,12 +420,15 @@ class SystemGenerator:
         self.console_dat_base = 0
         self.lock_free_space = 0
 
-        # Output buffer
-        self.output = bytearray()
+        # Output: SYSTEM.DAT followed by the record-reversed memory image,
+        # kept as two buffers and written back to back
+        self.reversed_image = bytearray()
         self.record_count = 0
 
-        # Memory image (set during generation)
-        self.mem_image = bytearray()
+        # Memory image (set during generation): a window onto self.memory,
+        # which is allocated once and covers every address below SYSTEM.DAT
+        self.memory = bytearray(config.mem_top * 256)
+        self.mem_image = memoryview(self.memory)[:0]
         self.image_base = 0
 
         # System data (256 bytes)
@@ -364,7 +440,6 @@ class SystemGenerator:
         self.xdos003 = bytearray(6)     # XIOS common base
         self.sysdatadr = bytearray(2)   # System data page address
         self.bnkxios000 = bytearray(256)  # XIOS jump table
-        self.cmn_xdos_jmp_tbl = bytearray(40)
         self.act_xios_common_base = 0
 
     def load_modules(self) -> None:
@@ -421,29 +496,30 @@ class SystemGenerator:
         # Fill with defaults first
         self.system_data = bytearray(256)
 
+        # Config-dependent fields are packed in three runs rather than byte
+        # by byte; everything else starts as zero or is filled in later
+
         # Basic configuration (offsets match SYSDAT.LIT)
-        self.system_data[0] = cfg.mem_top
-        self.system_data[1] = cfg.num_consoles
-        self.system_data[2] = cfg.breakpoint_rst
-        self.system_data[3] = 0xFF if cfg.sys_call_stks else 0
-        self.system_data[4] = 0xFF if cfg.bank_switched else 0
-        self.system_data[5] = 0xFF if cfg.z80_cpu else 0
-        self.system_data[6] = 0xFF if cfg.banked_bdos else 0
         # Bytes 7-14 filled during module loading
-        self.system_data[15] = cfg.num_mem_segments
-
         # Memory segment table (bytes 16-47) - filled later
+        _SYSDAT_CONFIG.pack_into(
+            self.system_data, 0,
+            cfg.mem_top,
+            cfg.num_consoles,
+            cfg.breakpoint_rst,
+            0xFF if cfg.sys_call_stks else 0,
+            0xFF if cfg.bank_switched else 0,
+            0xFF if cfg.z80_cpu else 0,
+            0xFF if cfg.banked_bdos else 0)
+        self.system_data[15] = cfg.num_mem_segments
 
-        # Byte 122: ticks per second
-        self.system_data[122] = cfg.ticks_per_second
-
-        # Byte 123: system drive
-        self.system_data[123] = cfg.system_drive
-
-        # Byte 124: common base
-        self.system_data[124] = cfg.common_base
-
+        # Bytes 122-124: ticks per second, system drive, common base
         # Byte 125: number of RSPs (filled later)
+        _SYSDAT_TIMING.pack_into(
+            self.system_data, 122,
+            cfg.ticks_per_second,
+            cfg.system_drive,
+            cfg.common_base)
 
         # Bytes 144-180: Copyright (37 bytes, no trailing space)
         # Read from RESBDOS.SPR code section (skip leading space)
@@ -457,20 +533,18 @@ class SystemGenerator:
                                                 self.SERIAL_OFFSET + self.SERIAL_LEN])
         self.system_data[181:181+self.SERIAL_LEN] = serial_bytes
 
-        # File/record limits
-        self.system_data[187] = cfg.max_locked_records
-        self.system_data[188] = cfg.max_open_files
-        struct.pack_into('<H', self.system_data, 189,
-                        cfg.total_locked_records + cfg.total_open_files)
-        self.system_data[193] = cfg.total_locked_records
-        self.system_data[194] = cfg.total_open_files
-
-        # Dayfile logging
-        self.system_data[195] = 0xFF if cfg.day_file else 0
-
-        # Drives
-        self.system_data[196] = cfg.temp_file_drive
-        self.system_data[197] = cfg.num_printers
+        # Bytes 187-197: file/record limits (191-192, lock free space, filled
+        # later), dayfile logging, drives
+        _SYSDAT_LIMITS.pack_into(
+            self.system_data, 187,
+            cfg.max_locked_records,
+            cfg.max_open_files,
+            cfg.total_locked_records + cfg.total_open_files,
+            cfg.total_locked_records,
+            cfg.total_open_files,
+            0xFF if cfg.day_file else 0,
+            cfg.temp_file_drive,
+            cfg.num_printers)
 
     def calculate_memory_layout(self) -> None:
         """Calculate memory layout for all modules."""
@@ -516,7 +590,7 @@ class SystemGenerator:
             for j in range(min(cfg.num_mem_segments, 8)):
                 stack_addr = self.tmpd_base * 256 - j * 64
                 offset = 80 + j * 2
-                struct.pack_into('<H', self.system_data, offset, stack_addr)
+                _U16.pack_into(self.system_data, offset, stack_addr)
 
     def load_and_relocate_module(self, module: SPRModule, name: str) -> Tuple[int, int]:
         """Load and relocate a module, returning (base_page, size_pages)."""
@@ -528,35 +602,19 @@ class SystemGenerator:
         prev_base = self.cur_base
         self.cur_base -= pages_needed
         base_page = self.cur_base
+        if base_page < 0:
+            raise ValueError(f"{module.name} ({pages_needed:02X}00H bytes) does not fit "
+                             f"below {prev_base:02X}00H")
 
-        # Relocate module using standard PRL bitmap
-        module.relocate(base_page)
+        # Relocate module using standard PRL bitmap, straight into its
+        # final place in the memory image
+        start = base_page * 256
+        module.relocate(base_page, memoryview(self.memory)[start:start + module.psize])
 
         print(f"  {name:12s}  {base_page:02X}00H  {pages_needed:02X}00H")
 
         return base_page, pages_needed
 
-    def write_module(self, module: SPRModule) -> int:
-        """Write module to memory image at correct offset."""
-        # Calculate offset within memory image
-        # Memory image starts at self.image_base and module.base is the load address
-        offset = module.base - self.image_base
-
-        if offset < 0:
-            raise ValueError(f"Module {module.name} base {module.base:04X}H below image base {self.image_base:04X}H")
-
-        # Ensure buffer is large enough
-        end_offset = offset + len(module.code)
-        if end_offset > len(self.mem_image):
-            raise ValueError(f"Module {module.name} extends beyond memory image")
-
-        # Write module code to memory image
-        self.mem_image[offset:offset + len(module.code)] = module.code
-
-        # Return the record number (offset within MPM.SYS file)
-        # Record 0-1 is SYSTEM.DAT, so record starts at (256 + offset) / 128
-        return (256 + offset) // 128
-
     def generate(self) -> None:
         """Generate the complete MPM.SYS file."""
         cfg = self.config
@@ -574,26 +632,27 @@ class SystemGenerator:
         print("\nMemory Layout:")
         self.calculate_memory_layout()
 
-        # Track all modules to write later
-        modules_to_write: List[SPRModule] = []
-
         # Load and relocate RESBDOS
         base, size = self.load_and_relocate_module(self.resbdos, "RESBDOS SPR")
         self.system_data[8] = base  # resbdos_base
-        self.resbdos009 = bytes(self.resbdos.code[9:12])
-        self.resbdos012 = bytes(self.resbdos.code[12:18])
-        modules_to_write.append(self.resbdos)
+        # Cross-references are views: the module code they point into is not
+        # patched again once they are captured
+        resbdos = memoryview(self.resbdos.code)
+        self.resbdos009 = resbdos[9:12]
+        self.resbdos012 = resbdos[12:18]
 
         # Load and relocate XDOS
         base, size = self.load_and_relocate_module(self.xdos, "XDOS    SPR")
         self.system_data[11] = base  # xdos_base
         # Patch XDOS with RESBDOS cross-references
-        self.xdos.code[9:12] = self.resbdos009
+        # (module patches go through memoryviews: in place and fixed-length,
+        # so a short module is an error instead of a silently resized one)
+        xdos = memoryview(self.xdos.code)
+        xdos[9:12] = self.resbdos009
         self.sysdatadr[0] = 0
         self.sysdatadr[1] = cfg.mem_top
-        self.xdos.code[12:14] = self.sysdatadr
-        self.xdos003 = bytes(self.xdos.code[3:9])
-        modules_to_write.append(self.xdos)
+        xdos[12:14] = self.sysdatadr
+        self.xdos003 = xdos[3:9]
 
         # Note: BDOS/XDOS entry point (bytes 245-246) set later after BNKXIOS is loaded
 
@@ -614,12 +673,11 @@ class SystemGenerator:
 
             # Patch this RSP's pd_link (offset 0-1) to point to previous RSP
             # First RSP loaded has pd_link=0 (it's the highest address, end of list)
-            struct.pack_into('<H', rsp.rsp.code, 0, prev_rsp_addr)
+            _U16.pack_into(rsp.rsp.code, 0, prev_rsp_addr)
 
             prev_rsp_addr = base * 256  # This RSP becomes the previous for next iteration
             rsp_link = base * 256  # Track lowest RSP for rspl
 
-            modules_to_write.append(rsp.rsp)
 
         self.system_data[12] = self.cur_base  # rsp_base
 
@@ -630,7 +688,7 @@ class SystemGenerator:
         # Get actual XIOS common base from module (AFTER relocation)
         # First JP instruction at offset 0 jumps to COMMONBASE
         # After relocation, bytes 1-2 contain the relocated target address
-        self.act_xios_common_base = struct.unpack('<H', self.bnkxios.code[1:3])[0]
+        self.act_xios_common_base = int.from_bytes(self.bnkxios.code[1:3], 'little')
 
         if self.act_xios_common_base < cfg.common_base * 256:
             # For our emulator XIOS, common base might be the module base itself
@@ -646,49 +704,46 @@ class SystemGenerator:
         # COMMONBASE structure: JP boot, JP swtuser, JP swtsys, JP pdisp, JP xdos, DW sysdat
         # Offsets within COMMONBASE: +3=swtuser, +6=swtsys, +9=pdisp, +12=xdos, +15=sysdat
         offset = self.act_xios_common_base - base * 256
-        if offset + 17 <= len(self.bnkxios.code):
+        bnkxios = memoryview(self.bnkxios.code)
+        if 0 <= offset and offset + 17 <= len(bnkxios):
             # SWTUSER and SWTSYS from RESBDOS (6 bytes = 2 JP instructions)
             # DRI GENSYS: call move (6,.resbdos012,(act$xios$common$base-cur$top)+.sctbfr(0).record(003))
-            self.bnkxios.code[offset + 3:offset + 9] = self.resbdos012
+            bnkxios[offset + 3:offset + 9] = self.resbdos012
             # PDISP and XDOS from XDOS (6 bytes = 2 JP instructions, already relocated)
             # DRI GENSYS: call move (6,.xdos003,(act$xios$common$base-cur$top)+.sctbfr(0).record(009))
-            self.bnkxios.code[offset + 9:offset + 15] = self.xdos003
+            bnkxios[offset + 9:offset + 15] = self.xdos003
             # SYSDAT address
             # DRI GENSYS: call move (2,.sysdatadr,(act$xios$common$base-cur$top)+.sctbfr(0).record(015))
-            self.bnkxios.code[offset + 15:offset + 17] = self.sysdatadr
+            bnkxios[offset + 15:offset + 17] = self.sysdatadr
 
         # Note: DRI GENSYS does NOT set bytes 245-246 (bdos_entry).
         # These may be filled in at runtime by MPMLDR or not used in MP/M 2.0.
 
         # Save XIOS jump table (first 256 bytes)
-        self.bnkxios000 = bytes(self.bnkxios.code[:256])
-        modules_to_write.append(self.bnkxios)
+        self.bnkxios000 = bnkxios[:256]
 
         # Load and relocate BNKBDOS
         base, size = self.load_and_relocate_module(self.bnkbdos, "BNKBDOS SPR")
         self.system_data[14] = base  # bnkbdos_base
-        modules_to_write.append(self.bnkbdos)
 
         # Load and relocate BNKXDOS
         base, size = self.load_and_relocate_module(self.bnkxdos, "BNKXDOS SPR")
         # Note: DRI GENSYS does NOT set byte 241 (cmnxdos_base), leaves it as 0
         self.system_data[242] = base  # bnkxdos_base
         # Patch sysdatadr
-        self.bnkxdos.code[0:2] = self.sysdatadr
+        bnkxdos = memoryview(self.bnkxdos.code)
+        bnkxdos[0:2] = self.sysdatadr
         # Patch XDOS with BNKXDOS jump table at offset 14
         # Analysis of DRI GENSYS output shows this goes at the START of XDOS (offset 14),
         # not at the end. The table contains relocated BNKXDOS addresses for banked functions.
-        cmn_xdos_jmp_tbl = bytes(self.bnkxdos.code[4:44])  # 40 bytes from BNKXDOS
-        self.xdos.code[14:54] = cmn_xdos_jmp_tbl
-        modules_to_write.append(self.bnkxdos)
+        xdos[14:54] = bnkxdos[4:44]  # 40 bytes from BNKXDOS
 
         # Load TMP if needed
         if self.tmp:
             base, size = self.load_and_relocate_module(self.tmp, "TMP     SPR")
             self.system_data[243] = self.tmpd_base  # tmpd_base
             self.system_data[247] = base  # tmp_base
-            self.tmp.code[0:2] = self.sysdatadr
-            modules_to_write.append(self.tmp)
+            memoryview(self.tmp.code)[0:2] = self.sysdatadr
 
         # Load BRS modules for RSPs
         # GENSYS builds a linked list of BRS modules:
@@ -706,29 +761,28 @@ class SystemGenerator:
                 # Get INITSP from BRS header (offset 2-3) AFTER relocation
                 # INITSP is already the absolute stack pointer address after relocation
                 # (it was a label reference that got relocated)
-                stack_ptr = struct.unpack('<H', rsp.brs.code[2:4])[0]
+                stack_ptr = int.from_bytes(rsp.brs.code[2:4], 'little')
 
                 # Patch BRS offset 0-1 (RSPBASE) with RSP base address
-                struct.pack_into('<H', rsp.brs.code, 0, rsp.rsp_base)
+                _U16.pack_into(rsp.brs.code, 0, rsp.rsp_base)
 
                 # Patch BRS offset 2-3 with link to previous BRS (brspl)
                 # This overwrites INITSP but we saved it above
-                struct.pack_into('<H', rsp.brs.code, 2, brspl)
+                _U16.pack_into(rsp.brs.code, 2, brspl)
                 brspl = brs_base  # This BRS becomes the new list head
 
                 # Patch RSP offset 6-7 (pd_stkptr) with the saved INITSP
                 # Note: pd_link at RSP offset 0-1 was already set during RSP loading
-                struct.pack_into('<H', rsp.rsp.code, 6, stack_ptr)
+                _U16.pack_into(rsp.rsp.code, 6, stack_ptr)
 
                 # Read back pd_link for debug output
-                pd_link = struct.unpack('<H', rsp.rsp.code[0:2])[0]
+                pd_link = int.from_bytes(rsp.rsp.code[0:2], 'little')
                 print(f"    RSP patches: pd_link={pd_link:04X}H, stkptr={stack_ptr:04X}H")
                 # Note: brspl was already updated to brs_base above
                 # The value written to BRS offset 2-3 was the OLD brspl (before update)
-                old_brspl = struct.unpack('<H', rsp.brs.code[2:4])[0]  # Read back what we wrote
+                old_brspl = int.from_bytes(rsp.brs.code[2:4], 'little')  # Read back what we wrote
                 print(f"    BRS patches: RSPBASE={rsp.rsp_base:04X}H, link={old_brspl:04X}H")
 
-                modules_to_write.append(rsp.brs)
                 brsp_base = base  # Base of last (lowest) BRS module
                 nmb_brsps += 1
 
@@ -736,7 +790,7 @@ class SystemGenerator:
         if nmb_brsps > 0:
             self.system_data[249] = brsp_base  # brsp_base
             # brspl (bytes 250-251) = address of first BRS in linked list
-            struct.pack_into('<H', self.system_data, 250, brspl)
+            _U16.pack_into(self.system_data, 250, brspl)
 
         # Calculate lock table space
         total_list_items = cfg.total_locked_records + cfg.total_open_files
@@ -744,7 +798,7 @@ class SystemGenerator:
         prev_base = self.cur_base
         self.cur_base -= lock_pages
         self.lock_free_space = self.cur_base * 256
-        struct.pack_into('<H', self.system_data, 191, self.lock_free_space)
+        _U16.pack_into(self.system_data, 191, self.lock_free_space)
         print(f"  LCKLSTS DAT  {self.cur_base:02X}00H  {lock_pages:02X}00H")
 
         # Console data region
@@ -763,52 +817,61 @@ class SystemGenerator:
         # Note: SYSTEM.DAT occupies mem_top*256 to mem_top*256+255 (record 0-1)
         # The code image covers cur_base*256 to mem_top*256-1 (records 2+)
         self.image_base = self.cur_base * 256
+        if self.image_base < 0:
+            raise ValueError(f"System needs {-self.cur_base:02X}00H bytes more memory than available")
         image_size = cfg.mem_top * 256 - self.image_base  # Don't include SYSTEM.DAT area
-        self.mem_image = bytearray(image_size)
+        self.mem_image = memoryview(self.memory)[self.image_base:cfg.mem_top * 256]
         print(f"\n  Memory image: {self.image_base:04X}H - {cfg.mem_top * 256 - 1:04X}H ({image_size} bytes)")
 
-        # Write all modules to memory image
-        for module in modules_to_write:
-            self.write_module(module)
-
+        # Modules were relocated in place, so the image already holds them
         # Copy XIOS jump table to XIOSJMP TBL location
         # The XIOSJMP TBL is at xios_jmp_tbl_base (FB00H typically)
         # This provides a fixed entry point for XIOS calls from any bank
         xios_tbl_offset = self.xios_jmp_tbl_base * 256 - self.image_base
         if xios_tbl_offset >= 0 and xios_tbl_offset + 256 <= len(self.mem_image):
-            self.mem_image[xios_tbl_offset:xios_tbl_offset + 256] = self.bnkxios000
+            self.mem_image[xios_tbl_offset:xios_tbl_offset + len(self.bnkxios000)] = self.bnkxios000
             print(f"  Copied XIOS jump table to {self.xios_jmp_tbl_base:02X}00H")
 
         # Calculate record count
         self.record_count = (256 + len(self.mem_image) + 127) // 128
 
         # Finalize system data
-        struct.pack_into('<H', self.system_data, 120, self.record_count)  # nmb_records
+        _U16.pack_into(self.system_data, 120, self.record_count)  # nmb_records
         # Note: DRI GENSYS does NOT set bytes 252-253 (sysdatadr in SYSTEM.DAT).
         # MPMLDR calculates this from mem_top at runtime.
 
         # Update RSP links
         self.system_data[125] = len(self.rsps)  # nmb_rsps
         if self.rsps:
-            struct.pack_into('<H', self.system_data, 254, rsp_link)  # rspl
+            _U16.pack_into(self.system_data, 254, rsp_link)  # rspl
 
         # Build final output: SYSTEM.DAT + memory image
-        # Pad memory image to 128-byte boundary
-        padded_image = self.mem_image + bytes((-len(self.mem_image)) % 128)
-
         # IMPORTANT: MPMLDR loads records DOWNWARD from mem_top!
         # Record 2 gets loaded to (mem_top*256 - 128), record 3 to (mem_top*256 - 256), etc.
         # So the file must contain high addresses first, low addresses last.
         # We need to reverse the 128-byte records in the image.
-        num_records = len(padded_image) // 128
-        reversed_image = bytearray()
-        for i in range(num_records - 1, -1, -1):
-            reversed_image.extend(padded_image[i * 128:(i + 1) * 128])
-
-        self.output = self.system_data + reversed_image
-        self.record_count = len(self.output) // 128
-
-        print(f"\nGenerated {self.record_count} records ({len(self.output)} bytes)")
+        #
+        # The records are copied straight from the memory image into a buffer
+        # allocated once. Padding to the 128-byte boundary belongs to the top
+        # record, which comes first, and is already zero in that buffer.
+        image_len = len(self.mem_image)
+        num_records = (image_len + 127) // 128
+        self.reversed_image = reversed_image = bytearray(num_records * 128)
+        with memoryview(reversed_image) as dst:
+            for i in range(num_records):
+                src = (num_records - 1 - i) * 128
+                record = self.mem_image[src:src + 128]
+                dst[i * 128:i * 128 + len(record)] = record
+
+        output_len = self.output_len
+        self.record_count = output_len // 128
+
+        print(f"\nGenerated {self.record_count} records ({output_len} bytes)")
+
+    @property
+    def output_len(self) -> int:
+        """Size of MPM.SYS: SYSTEM.DAT plus the reversed memory image."""
+        return len(self.system_data) + len(self.reversed_image)
 
     def setup_memory_segments(self) -> None:
         """Set up memory segment table in system data."""
@@ -818,10 +881,10 @@ class SystemGenerator:
 
         # First segment is always the MP/M II system (pre-allocated)
         seg_offset = 16
-        self.system_data[seg_offset] = self.cur_base
-        self.system_data[seg_offset + 1] = 0xFF - self.cur_base + 1
-        self.system_data[seg_offset + 2] = 0x80  # Pre-allocated
-        self.system_data[seg_offset + 3] = 0  # Bank 0
+        _MEMSEG.pack_into(self.system_data, seg_offset,
+                          self.cur_base, 0xFF - self.cur_base + 1,
+                          0x80,  # Pre-allocated
+                          0)  # Bank 0
         print(f"  MP/M II Sys  {self.cur_base:02X}00H  {0xFF - self.cur_base + 1:02X}00H  Bank 0")
 
         # User segments (one per bank for bank-switched systems)
@@ -831,10 +894,10 @@ class SystemGenerator:
             if seg_offset >= 48:
                 break
             # User segment from 0 to common base
-            self.system_data[seg_offset] = 0
-            self.system_data[seg_offset + 1] = cfg.common_base
-            self.system_data[seg_offset + 2] = 0  # Not pre-allocated
-            self.system_data[seg_offset + 3] = i  # Bank number
+            _MEMSEG.pack_into(self.system_data, seg_offset,
+                              0, cfg.common_base,
+                              0,  # Not pre-allocated
+                              i)  # Bank number
             print(f"  Memseg  Usr  0000H  {cfg.common_base:02X}00H  Bank {i}")
             total_segments += 1
 
@@ -843,8 +906,21 @@ class SystemGenerator:
 
     def write_output(self, path: Path) -> None:
         """Write MPM.SYS to file."""
-        path.write_bytes(self.output)
-        print(f"\nWrote {len(self.output)} bytes to {path}")
+        if hasattr(os, 'writev'):
+            # One gather write from both buffers (POSIX); loop on short writes
+            buffers = [memoryview(self.system_data), memoryview(self.reversed_image)]
+            with path.open('wb', buffering=0) as f:
+                while buffers:
+                    written = os.writev(f.fileno(), buffers)
+                    while buffers and written >= len(buffers[0]):
+                        written -= len(buffers.pop(0))
+                    if buffers:
+                        buffers[0] = buffers[0][written:]
+        else:
+            with path.open('wb') as f:
+                f.write(self.system_data)
+                f.write(self.reversed_image)
+        print(f"\nWrote {self.output_len} bytes to {path}")
 
     def write_system_dat(self, path: Path) -> None:
         """Write SYSTEM.DAT to separate file."""
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+MP/M II Source Change Watcher
+
+Keeps a journal of changed source files so build.py can skip clean targets
+without stat'ing or hashing their sources. Linux only (inotify via libc).
+
+Usage:
+    python watch_daemon.py &
+    python build.py          # now consults the journal
+
+Journal format (BUILD_DIR/.dirty), one event per line:
+    <time_ns> <path relative to PROJECT_ROOT>
+    <time_ns> *              (event queue overflowed: everything is dirty)
+    <time_ns> !sync <name>   (acknowledges a build's sync file)
+
+The journal is truncated each time the watcher starts and compacted at each
+sync request, down to the newest line per path plus the sync lines of builds
+still waiting, so its size doesn't grow with the watcher's lifetime. build.py
+only trusts it for digests recorded after the start time written to
+BUILD_DIR/.watch.pid (see Builder.journal_clean).
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import signal
+import struct
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from build import (PROJECT_ROOT, SRC_ROOT, BUILD_DIR, WATCH_JOURNAL, WATCH_PIDFILE,
+                   WATCH_SYNC_PREFIX)
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Source trees (recursive): DRI sources, overrides + runtime, build scripts
+WATCH_ROOTS = [SRC_ROOT, PROJECT_ROOT / "src", Path(__file__).parent]
+
+
+class Watcher:
+    """Recursive inotify watch over WATCH_ROOTS plus BUILD_DIR (for sync files)"""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = PROJECT_ROOT.resolve()
+        self.dirs = {}  # wd -> absolute directory path
+        self.latest = {}  # journal key -> newest change time
+        self.syncs = {}  # sync file name -> time it was journaled
+
+        for root in WATCH_ROOTS:
+            self.add_tree(str(root.resolve()))
+        self.build_wd = self.add_watch(str(BUILD_DIR.resolve()))
+
+    def add_watch(self, directory: str) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            return wd  # vanished or unreadable; its parent's events still arrive
+        self.dirs[wd] = directory
+        return wd
+
+    def add_tree(self, directory: str):
+        """Watch a directory and everything below it"""
+        self.add_watch(directory)
+        for dirpath, dirnames, _ in os.walk(directory):
+            for name in dirnames:
+                self.add_watch(os.path.join(dirpath, name))
+
+    def events(self):
+        """Block for the next batch of events; yield (mask, wd, name)"""
+        data = os.read(self.fd, 64 * 1024)
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0").decode(errors="surrogateescape")
+            pos += length
+            yield mask, wd, name
+
+    def relpath(self, path: str) -> str:
+        """Journal key: path relative to PROJECT_ROOT, as build.py spells it"""
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def compact(self):
+        """
+        Replace the journal with the newest line per path, plus the sync
+        lines whose sync file still exists (builds that may not have seen
+        theirs yet). Written to a temporary file and renamed over the
+        journal, so a build reading it sees either version whole.
+        """
+        build_dir = WATCH_JOURNAL.parent
+        self.syncs = {name: stamp for name, stamp in self.syncs.items()
+                      if (build_dir / name).exists()}
+        lines = [f"{stamp} {key}\n" for key, stamp in self.latest.items()]
+        lines += [f"{stamp} !sync {name}\n" for name, stamp in self.syncs.items()]
+        tmp = WATCH_JOURNAL.with_name(WATCH_JOURNAL.name + ".tmp")
+        tmp.write_text("".join(lines), errors="surrogateescape")
+        os.replace(tmp, WATCH_JOURNAL)
+
+    def run(self):
+        """Journal events until interrupted"""
+        journal = open(WATCH_JOURNAL, "a", errors="surrogateescape")
+        try:
+            while True:
+                stamp = time.time_ns()
+                lines = []
+                synced = False
+
+                def changed(key):
+                    self.latest[key] = stamp
+                    lines.append(f"{stamp} {key}\n")
+
+                for mask, wd, name in self.events():
+                    if mask & IN_Q_OVERFLOW:
+                        changed("*")
+                        continue
+                    if mask & IN_IGNORED:
+                        self.dirs.pop(wd, None)
+                        continue
+                    directory = self.dirs.get(wd)
+                    if directory is None or not name:
+                        continue
+                    if wd == self.build_wd:
+                        if name.startswith(WATCH_SYNC_PREFIX) and mask & IN_CREATE:
+                            self.syncs[name] = stamp
+                            synced = True
+                        continue
+                    path = os.path.join(directory, name)
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        self.add_tree(path)
+                        # Files created before the watch was in place
+                        for dirpath, _, filenames in os.walk(path):
+                            for f in filenames:
+                                changed(self.relpath(os.path.join(dirpath, f)))
+                    changed(self.relpath(path))
+                if synced:
+                    # Everything so far is in self.latest: rewrite instead of appending
+                    journal.close()
+                    self.compact()
+                    journal = open(WATCH_JOURNAL, "a", errors="surrogateescape")
+                elif lines:
+                    journal.write("".join(lines))
+                    journal.flush()
+        finally:
+            journal.close()
+
+
+def main():
+    if not sys.platform.startswith("linux"):
+        print("watch_daemon.py requires Linux inotify", file=sys.stderr)
+        return 1
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Watches go in before the start time is published, so every change
+    # after that time is guaranteed to reach the journal.
+    watcher = Watcher()
+    WATCH_JOURNAL.write_text("")
+    WATCH_PIDFILE.write_text(f"{os.getpid()} {time.time_ns()}\n")
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Watching {len(watcher.dirs)} directories (pid {os.getpid()})")
+    try:
+        watcher.run()
+    finally:
+        WATCH_PIDFILE.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())